@@ -0,0 +1,231 @@
+"""
+Benchmarks - Offline throughput numbers for the FT95 pipeline
+
+Usage:  python benchmark.py ingest --devices 4 --rate 250 --duration 5 --clients 20
+        python benchmark.py decode --frames 1000000
+        python benchmark.py exporters --readings 20000 --sinks sheets,csv,sqlite --latency 0.3
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from threading import Thread
+from config import Config
+from reading import Reading
+from storage import ReadingStore
+
+def _timed(handler, metrics):
+    def timed(characteristic, data):
+        started = time.perf_counter_ns()
+        handler(characteristic, data)
+        metrics.observe('ble_callback', (time.perf_counter_ns() - started) / 1e6)
+    return timed
+
+def bench_ingest(args):
+    """Simulated FT95 notifications -> full hot path (store, exporters, broadcast) without BLE"""
+    workdir = tempfile.mkdtemp(prefix='ft95-bench-')
+    Config.DATA_FILE = os.path.join(workdir, 'store.db')
+    Config.THERMOMETER_DEVICES = ','.join(f"FF:00:00:00:{i // 256:02X}:{i % 256:02X}=SIM-{i}"
+                                          for i in range(args.devices))
+    Config.EXPORTERS = args.exporters
+    Config.GOOGLE_SHEET_ID = ''
+    Config.SHEETS_BACKEND = 'fake'
+    Config.CSV_FILE = os.path.join(workdir, 'export.csv')
+
+    import main
+    from metrics import metrics
+    from simulator import FT95Simulator
+    system = main.FT95System()
+    system.initialize()
+    system.running = True
+    system.dispatcher.start()  # BLE callback sirf enqueue kare, jaise asli system mein
+    for sync in system.exporters:
+        Thread(target=system._export_worker, args=(sync,), daemon=True).start()
+    clients = [main.socketio.test_client(system.app) for _ in range(args.clients)]
+
+    thermometers = list(system.gateway.devices.values())
+    for thermometer in thermometers:
+        thermometer.callback = system._on_ble_reading  # continuous_real_read yahi set karta hai
+        # BLE thread par notification handler kitna waqt leta hai
+        thermometer.notification_handler = _timed(thermometer.notification_handler, metrics)
+
+    print(f"🚀 Ingest: {args.devices} simulated device(s) at "
+          f"{f'{args.rate:g}/s each' if args.rate else 'max rate'}, {args.clients} socket client(s), "
+          f"exporters: {args.exporters or 'none'}")
+    simulator = FT95Simulator(thermometers, rate=args.rate).start()
+    time.sleep(args.warmup)
+    metrics.reset()
+    first_seq = system.broadcaster.last_seq
+    started = time.perf_counter()
+    time.sleep(args.duration)
+    elapsed = time.perf_counter() - started
+    ingested = system.broadcaster.last_seq - first_seq
+    simulator.stop()
+    if len(system.dispatcher):
+        print(f"   ⏳ Draining {len(system.dispatcher)} queued reading(s) (producers outran the dispatcher)")
+    while len(system.dispatcher):
+        time.sleep(0.01)
+    stages = metrics.snapshot()
+
+    # Memory: ek fixed number of readings ke baad kitni memory reh gayi (ring buffer bhara hua hai)
+    system.store.flush()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    FT95Simulator(thermometers, rate=0).start(count=max(1, args.memory_readings // args.devices)).join()
+    while len(system.dispatcher):
+        time.sleep(0.01)
+    system.store.flush()
+    for client in clients:
+        client.get_received()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    system.store.flush()
+    persisted = system.store.committed_seq
+    system.running = False
+    system.store.close()
+
+    print("=" * 60)
+    print(f"Ingested          : {ingested} readings in {elapsed:.2f}s ({ingested / elapsed:,.0f} readings/s)")
+    if system.emits_shed:
+        print(f"Emits shed        : {system.emits_shed} readings stored but not emitted (backlog > {Config.DISPATCH_SHED_BACKLOG})")
+    for name, label in (('ble_callback', 'BLE callback ms'), ('notify_to_lock', 'Notify->lock ms'),
+                        ('notify_to_emit', 'Notify->emit ms')):
+        data = stages.get(name)
+        if data:
+            print(f"{label:<18}: p50 {data['p50_ms']:.3f}, p95 {data['p95_ms']:.3f}, "
+                  f"p99 {data['p99_ms']:.3f}, max {data['max_ms']:.3f}")
+    print(f"Memory retained   : {retained / 1024:,.1f} KB after {args.memory_readings} more readings "
+          f"({retained / max(1, args.memory_readings):,.1f} B/reading)")
+    print(f"Persisted         : {persisted} readings in {Config.DATA_FILE}")
+    print("=" * 60)
+
+def bench_decode(args):
+    """Per-frame parsing vs one vectorized pass over stored (timestamped) 0x2A1C records"""
+    import random
+    from datetime import datetime, timedelta
+    from ft95_decoder import decode_frames, parse_temperature_measurement, readings_from_frames
+    from simulator import ft95_packet
+
+    start = datetime.now().replace(microsecond=0) - timedelta(days=30)
+    packets = [bytes(ft95_packet(random.uniform(35.0, 41.0), start + timedelta(seconds=2 * i)))
+               for i in range(min(args.frames, 100000))]
+    packets = packets * (args.frames // len(packets))
+    frames = len(packets)
+    print(f"🚀 Decoding {frames:,} FT95 stored records...")
+
+    sample = packets[:100000]
+    started = time.perf_counter()
+    for packet in sample:
+        parse_temperature_measurement(packet)
+    single = (time.perf_counter() - started) / len(sample)
+
+    started = time.perf_counter()
+    decoded = decode_frames(packets)
+    batch = time.perf_counter() - started
+
+    started = time.perf_counter()
+    readings_from_frames(decoded, device='BENCH')
+    objects = time.perf_counter() - started
+
+    print("=" * 60)
+    print(f"Per frame         : {single * 1e6:.2f} us/frame ({1 / single:,.0f} frames/s)")
+    print(f"Vectorized        : {batch * 1000:.1f} ms total ({frames / batch:,.0f} frames/s)")
+    print(f"-> Reading objects: {objects * 1000:.1f} ms ({frames / objects:,.0f} readings/s)")
+    print("=" * 60)
+
+def bench_exporters(args):
+    """Push readings through every sink concurrently (fake Sheets backend) and time the drain"""
+    from exporters import create_exporters
+    from export_sync import ExportSync
+
+    workdir = tempfile.mkdtemp(prefix='ft95-bench-')
+    Config.SHEETS_BACKEND = 'fake'
+    Config.FAKE_SHEETS_LATENCY = args.latency
+    Config.CSV_FILE = os.path.join(workdir, 'export.csv')
+    Config.EXPORT_SQLITE_FILE = os.path.join(workdir, 'export.db')
+
+    store = ReadingStore(os.path.join(workdir, 'store.db'), flush_interval=0.05).open()
+    exporters = create_exporters(args.sinks.split(','))
+    syncs = []
+    for exporter in exporters:
+        exporter.append_mode = True  # benchmark full history, not single row
+        exporter.interval = min(exporter.interval, args.interval)
+        syncs.append(ExportSync(store, exporter))
+
+    running = True
+    threads = [Thread(target=sync.run, args=(lambda: running,), daemon=True) for sync in syncs]
+    for thread in threads:
+        thread.start()
+
+    print(f"🚀 Exporting {args.readings} readings to {', '.join(sync.name for sync in syncs)} "
+          f"(fake Sheets latency {args.latency}s/call)...")
+    started = time.perf_counter()
+    for i in range(args.readings):
+        reading = Reading(36.0 + (i % 30) / 10, device='BENCH', mac_address='FF:00:00:00:00:01')
+        store.append(reading)
+        for sync in syncs:
+            sync.put(reading)
+    produced = time.perf_counter() - started
+
+    # Har sink ka drain time alag note karein (slow sink doosron ko nahi rokta)
+    drained = {}
+    deadline = started + args.timeout
+    while len(drained) < len(syncs) and time.perf_counter() < deadline:
+        for sync in syncs:
+            if sync.name not in drained and sync.synced_seq >= store.last_seq:
+                drained[sync.name] = time.perf_counter() - started
+        time.sleep(0.01)
+    running = False
+    for thread in threads:
+        thread.join(timeout=5)
+    store.close()
+
+    print("=" * 60)
+    print(f"Produced          : {args.readings} readings in {produced:.2f}s ({args.readings / produced:,.0f}/s)")
+    for sync in syncs:
+        seconds = drained.get(sync.name)
+        sheet = getattr(sync.exporter, 'sheet', None)
+        calls = f", {sheet.api_calls} API calls" if sheet is not None and hasattr(sheet, 'api_calls') else ''
+        if seconds is None:
+            print(f"{sync.name:<18}: not drained after {args.timeout}s (synced up to seq {sync.synced_seq}){calls}")
+        else:
+            print(f"{sync.name:<18}: drained in {seconds:.2f}s ({args.readings / seconds:,.0f} rows/s){calls}")
+    print(f"Output dir        : {workdir}")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FT95 offline benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help="reading ingestion hot path with simulated devices")
+    ingest.add_argument('--devices', type=int, default=4)
+    ingest.add_argument('--rate', type=float, default=250,
+                        help="notifications/sec per device (0 = saturate; latency then includes queueing)")
+    ingest.add_argument('--duration', type=float, default=5)
+    ingest.add_argument('--warmup', type=float, default=1)
+    ingest.add_argument('--clients', type=int, default=0, help="in-process Socket.IO clients")
+    ingest.add_argument('--exporters', default='', help="e.g. csv,sheets (fake Sheets backend)")
+    ingest.add_argument('--memory-readings', type=int, default=20000)
+    ingest.set_defaults(run=bench_ingest)
+
+    decode = commands.add_parser('decode', help="FT95 frame decoder throughput")
+    decode.add_argument('--frames', type=int, default=1000000)
+    decode.set_defaults(run=bench_decode)
+
+    exporters = commands.add_parser('exporters', help="exporter pipeline throughput")
+    exporters.add_argument('--readings', type=int, default=20000)
+    exporters.add_argument('--sinks', default='sheets,csv,sqlite', help="comma separated exporter names")
+    exporters.add_argument('--latency', type=float, default=0.3, help="fake Sheets seconds per API call")
+    exporters.add_argument('--interval', type=float, default=0.1, help="max seconds between export batches")
+    exporters.add_argument('--timeout', type=float, default=120)
+    exporters.set_defaults(run=bench_exporters)
+
+    args = parser.parse_args()
+    sys.exit(args.run(args))
@@ -0,0 +1,99 @@
+"""
+Shared BLE Scanner - One always-on scanner for every configured thermometer
+"""
+
+import asyncio
+from bleak import BleakScanner
+
+class AdvertisementScanner:
+    """Watches advertisements once and wakes the device task whose MAC appears"""
+
+    def __init__(self, scanning_mode='active', fresh_seconds=2.0, wait_timeout=30.0, stale_seconds=60.0):
+        self.scanning_mode = scanning_mode
+        self.fresh_seconds = fresh_seconds
+        self.wait_timeout = wait_timeout    # phir direct find_device_by_address
+        self.stale_seconds = stale_seconds  # itni der koi advertisement nahi = scanner mar gaya
+        self.running = False
+        self._scanner = None
+        self._last_advertisement = None
+        self._watchers = {}  # MAC -> asyncio.Event
+        self._seen = {}      # MAC -> (BLEDevice, loop time)
+
+    def watch(self, mac_address):
+        """Register interest in a MAC (must be called on the gateway loop)"""
+        return self._watchers.setdefault(mac_address.upper(), asyncio.Event())
+
+    async def start(self):
+        if self._scanner:
+            return
+        scanner = BleakScanner(
+            detection_callback=self._on_advertisement,
+            scanning_mode=self.scanning_mode
+        )
+        await scanner.start()
+        self._scanner = scanner
+        self._last_advertisement = asyncio.get_running_loop().time()
+        self.running = True
+        print(f"   📡 Shared BLE scanner active ({self.scanning_mode}, {len(self._watchers)} device(s))")
+
+    async def stop(self):
+        scanner, self._scanner = self._scanner, None
+        self.running = False
+        if scanner:
+            try:
+                await scanner.stop()
+            except Exception as e:
+                print(f"   ⚠️ Scanner stop error: {e}")
+
+    async def run_forever(self, retry_interval=5):
+        """Keep the scanner alive, restarting it if the adapter drops out"""
+        failures = 0
+        try:
+            while True:
+                # Adapter / bluetoothd reset ke baad scanner chup ho jata hai: koi bhi advertisement nahi aati
+                if self._scanner and asyncio.get_running_loop().time() - self._last_advertisement > self.stale_seconds:
+                    print(f"   🔄 No advertisements for {self.stale_seconds:.0f}s, restarting BLE scanner")
+                    await self.stop()
+                if not self._scanner:
+                    try:
+                        await self.start()
+                        failures = 0
+                    except Exception as e:
+                        failures += 1
+                        print(f"   ⚠️ BLE scanner error: {e}")
+                        if self.scanning_mode == 'passive' and failures >= 3:
+                            # e.g. BlueZ bina or_patterns ke passive scan nahi karta
+                            print("   📡 Passive scanning keeps failing, falling back to active")
+                            self.scanning_mode = 'active'
+                await asyncio.sleep(retry_interval)
+        finally:
+            await self.stop()
+
+    def _on_advertisement(self, device, advertisement_data):
+        self._last_advertisement = asyncio.get_running_loop().time()
+        mac_address = device.address.upper()
+        event = self._watchers.get(mac_address)
+        if event is None:
+            return
+        self._seen[mac_address] = (device, asyncio.get_running_loop().time())
+        event.set()
+
+    async def wait_for_device(self, mac_address):
+        """Sleep until the device advertises, then return its BLEDevice (None if it did not show up)"""
+        mac_address = mac_address.upper()
+        event = self.watch(mac_address)
+
+        # Abhi abhi advertise kiya ho to foran connect karein
+        seen = self._seen.get(mac_address)
+        if seen and asyncio.get_running_loop().time() - seen[1] <= self.fresh_seconds:
+            return seen[0]
+
+        event.clear()
+        if self._scanner:
+            try:
+                await asyncio.wait_for(event.wait(), self.wait_timeout)
+                return self._seen[mac_address][0]
+            except asyncio.TimeoutError:
+                pass
+        # Shared scanner band hai ya kuch nahi dekh raha: pehle jaisa direct scan, taake device task kabhi atke nahi
+        return await BleakScanner.find_device_by_address(mac_address, timeout=5.0)
@@ -0,0 +1,71 @@
+"""
+Socket.IO Broadcaster - Sends each reading once and only changed status fields
+"""
+
+from threading import Lock
+
+ALL_READINGS_ROOM = 'readings:all'
+
+def device_room(mac_address):
+    return f"device:{mac_address.upper()}"
+
+def ward_room(ward):
+    return f"ward:{ward}"
+
+# Ye fields ya to har second badalti hain (uptime) ya new_reading mein pehle se jati hain
+STATUS_DELTA_IGNORED = {'uptime', 'last_reading', 'last_seq'}
+
+def status_delta(old, new):
+    """Fields of `new` that differ from `old` (recursing into nested dicts)"""
+    changes = {}
+    for key, value in new.items():
+        if key in STATUS_DELTA_IGNORED:
+            continue
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = status_delta(previous, value)
+            if nested:
+                changes[key] = nested
+        elif value != previous:
+            changes[key] = value
+    return changes
+
+class Broadcaster:
+    """Server-side dedup by reading sequence number + delta-only status pushes"""
+
+    def __init__(self, socketio):
+        self.socketio = socketio
+        self.wards = {}  # MAC -> ward
+        self.last_seq = 0
+        self._last_status = {}
+        self._lock = Lock()
+
+    def reading_rooms(self, reading):
+        """Rooms interested in a reading: everyone-room, its device and its ward"""
+        rooms = [ALL_READINGS_ROOM]
+        if reading.mac_address:
+            rooms.append(device_room(reading.mac_address))
+            ward = self.wards.get(reading.mac_address)
+            if ward:
+                rooms.append(ward_room(ward))
+        return rooms
+
+    def publish_reading(self, reading):
+        """Emit a reading (once per subscribed socket) unless its sequence was already sent"""
+        with self._lock:
+            if reading.seq is not None and reading.seq <= self.last_seq:
+                return False
+            self.last_seq = reading.seq or self.last_seq
+        # Socket.IO rooms ki list: jo socket kai rooms mein ho use bhi sirf ek dafa milta hai
+        self.socketio.emit('new_reading', reading.to_json(), to=self.reading_rooms(reading))
+        return True
+
+    def publish_status(self, status):
+        """Emit only the status fields that changed since the last push"""
+        with self._lock:
+            changes = status_delta(self._last_status, status)
+            if not changes:
+                return False
+            self._last_status = status
+        self.socketio.emit('status_delta', changes)
+        return True
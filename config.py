@@ -11,6 +11,9 @@ class Config:
     PORT = int(os.getenv('PORT', 5000))
     HOST = os.getenv('HOST', '0.0.0.0')
     DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
+    # 'threading' (Werkzeug dev server) or 'gevent' (production, thousands of websockets)
+    ASYNC_MODE = os.getenv('ASYNC_MODE', 'threading').lower()
+    MAX_CONNECTIONS = int(os.getenv('MAX_CONNECTIONS', 10000))  # gevent concurrent connection cap
     
     # Bluetooth configuration
     THERMOMETER_MAC_ADDRESS = os.getenv('THERMOMETER_MAC_ADDRESS', 'FF:00:00:00:01:C8')
@@ -19,38 +22,116 @@ class Config:
     UPDATE_INTERVAL = int(os.getenv('UPDATE_INTERVAL', 2))
     CONNECTION_TIMEOUT = int(os.getenv('CONNECTION_TIMEOUT', 30))
     
+    # Multi-device gateway: comma separated "MAC", "MAC=Name" or "MAC=Name@Ward" entries.
+    # Empty means only THERMOMETER_MAC_ADDRESS / DEVICE_NAME is used.
+    THERMOMETER_DEVICES = os.getenv('THERMOMETER_DEVICES', '')
+    
+    # Shared scanner: 'active' or 'passive' (passive needs backend support, e.g. BlueZ or_patterns)
+    SCANNING_MODE = os.getenv('SCANNING_MODE', 'active').lower()
+    
     # FT95 Specific UUIDs (Beurer FT95)
     FT95_SERVICE_UUID = "0000fff0-0000-1000-8000-00805f9b34fb"
     FT95_TEMP_CHAR_UUID = "0000fff4-0000-1000-8000-00805f9b34fb"
     FT95_BATTERY_CHAR_UUID = "0000fff1-0000-1000-8000-00805f9b34fb"
     FT95_UNIT_CHAR_UUID = "0000fff2-0000-1000-8000-00805f9b34fb"
     
+    # Frames outside this range are rejected as corrupt before they reach storage
+    VALID_TEMP_MIN_C = float(os.getenv('VALID_TEMP_MIN_C', 25.0))
+    VALID_TEMP_MAX_C = float(os.getenv('VALID_TEMP_MAX_C', 45.0))
+    
+    # On connect, download measurements stored on the thermometer (RACP "report all records")
+    MEMORY_DOWNLOAD = os.getenv('MEMORY_DOWNLOAD', 'True').lower() == 'true'
+    MEMORY_DOWNLOAD_TIMEOUT = float(os.getenv('MEMORY_DOWNLOAD_TIMEOUT', 30))
+    # RACP (0x2A52) is not part of the Health Thermometer service (0x1809); it sits in a separate
+    # service that differs between firmware revisions. Set its UUID to keep GATT discovery limited;
+    # left empty while MEMORY_DOWNLOAD is on, every service is discovered so RACP can be found.
+    FT95_MEMORY_SERVICE_UUID = os.getenv('FT95_MEMORY_SERVICE_UUID', '').strip().lower()
+    # Battery / unit are re-read on connect only after this many seconds (notifications keep them fresh)
+    DEVICE_INFO_TTL = float(os.getenv('DEVICE_INFO_TTL', 3600))
+    
     # Google Sheets configuration
     GOOGLE_SHEET_ID = os.getenv('GOOGLE_SHEET_ID', '').strip()
     GOOGLE_CREDENTIALS_FILE = os.getenv('GOOGLE_CREDENTIALS_FILE', 'credentials.json')
     WORKSHEET_NAME = os.getenv('WORKSHEET_NAME', 'Temperature_Readings')
+    SHEETS_SYNC_INTERVAL = float(os.getenv('SHEETS_SYNC_INTERVAL', 5))
+    SHEETS_BATCH_SIZE = int(os.getenv('SHEETS_BATCH_SIZE', 500))
+    SHEETS_QUEUE_SIZE = int(os.getenv('SHEETS_QUEUE_SIZE', 1000))
+    SHEETS_MAX_BACKOFF = float(os.getenv('SHEETS_MAX_BACKOFF', 300))
+    # 'google' or 'fake' (in-process stand-in with simulated API latency, for offline runs/benchmarks)
+    SHEETS_BACKEND = os.getenv('SHEETS_BACKEND', 'google').lower()
+    FAKE_SHEETS_LATENCY = float(os.getenv('FAKE_SHEETS_LATENCY', 0.3))
+    
+    # Exporters: comma separated sheets, csv, sqlite, webhook, mqtt (each runs in its own worker).
+    # Empty means 'sheets' when GOOGLE_SHEET_ID is set, otherwise nothing.
+    EXPORTERS = os.getenv('EXPORTERS', '')
+    EXPORT_SYNC_INTERVAL = float(os.getenv('EXPORT_SYNC_INTERVAL', 1))
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    EXPORT_QUEUE_SIZE = int(os.getenv('EXPORT_QUEUE_SIZE', 5000))
+    EXPORT_MAX_BACKOFF = float(os.getenv('EXPORT_MAX_BACKOFF', 300))
+    EXPORT_SQLITE_FILE = os.getenv('EXPORT_SQLITE_FILE', 'temperature_export.db')
+    WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')
+    WEBHOOK_TIMEOUT = float(os.getenv('WEBHOOK_TIMEOUT', 10))
+    MQTT_HOST = os.getenv('MQTT_HOST', 'localhost')
+    MQTT_PORT = int(os.getenv('MQTT_PORT', 1883))
+    MQTT_TOPIC = os.getenv('MQTT_TOPIC', 'ft95/readings')
     
-    # Data storage
-    DATA_FILE = 'temperature_data.json'
-    CSV_FILE = 'temperature_log.csv'
+    # Data storage (DATA_FILE is the append-only SQLite/WAL reading store)
+    DATA_FILE = os.getenv('DATA_FILE', 'temperature_data.db')
+    CSV_FILE = os.getenv('CSV_FILE', 'temperature_log.csv')
+    STORE_FLUSH_INTERVAL = float(os.getenv('STORE_FLUSH_INTERVAL', 1.0))
     
     # Web interface
     AUTO_REFRESH = int(os.getenv('AUTO_REFRESH', 2))
     MAX_READINGS_DISPLAY = int(os.getenv('MAX_READINGS_DISPLAY', 50))
+    MAX_RESUME_READINGS = int(os.getenv('MAX_RESUME_READINGS', 500))  # beyond this a reconnect gets a snapshot
+    # Dispatcher backlog beyond which only the newest reading per device is emitted to sockets
+    # (every reading is still stored, exported and kept in the ring buffer)
+    DISPATCH_SHED_BACKLOG = int(os.getenv('DISPATCH_SHED_BACKLOG', 1000))
+    MAX_QUERY_POINTS = int(os.getenv('MAX_QUERY_POINTS', 500))  # buckets per /api/readings range query
     
     # Fast mode settings
     FAST_MODE = os.getenv('FAST_MODE', 'True').lower() == 'true'
+    # False = append every reading as a new sheet row (batched, full history)
     SINGLE_ROW_UPDATE = os.getenv('SINGLE_ROW_UPDATE', 'True').lower() == 'true'
     
+    @classmethod
+    def get_devices(cls):
+        """Return [(mac_address, device_name, ward)] for every configured thermometer"""
+        devices = []
+        for entry in cls.THERMOMETER_DEVICES.split(','):
+            entry = entry.strip()
+            if not entry:
+                continue
+            entry, _, ward = entry.partition('@')
+            mac, _, name = entry.partition('=')
+            mac = mac.strip().upper()
+            name = name.strip() or f"{cls.DEVICE_NAME}-{mac[-5:].replace(':', '')}"
+            devices.append((mac, name, ward.strip() or None))
+        
+        if not devices and cls.THERMOMETER_MAC_ADDRESS:
+            devices.append((cls.THERMOMETER_MAC_ADDRESS.upper(), cls.DEVICE_NAME, None))
+        return devices
+    
+    @classmethod
+    def get_exporters(cls):
+        """Names of the enabled export sinks"""
+        names = [name.strip().lower() for name in cls.EXPORTERS.split(',') if name.strip()]
+        if not names and cls.GOOGLE_SHEET_ID:
+            names = ['sheets']
+        return names
+    
     @classmethod
     def validate(cls):
         """Validate required configuration"""
         errors = []
         
-        if not cls.THERMOMETER_MAC_ADDRESS:
-            errors.append("THERMOMETER_MAC_ADDRESS not configured")
+        if cls.ASYNC_MODE not in ('threading', 'gevent'):
+            errors.append(f"ASYNC_MODE '{cls.ASYNC_MODE}' not supported (use 'threading' or 'gevent')")
+        
+        if not cls.get_devices():
+            errors.append("THERMOMETER_MAC_ADDRESS / THERMOMETER_DEVICES not configured")
         
-        if not cls.GOOGLE_SHEET_ID:
+        if 'sheets' in cls.get_exporters() and cls.SHEETS_BACKEND == 'google' and not cls.GOOGLE_SHEET_ID:
             errors.append("GOOGLE_SHEET_ID not configured")
         
         if errors:
@@ -0,0 +1,105 @@
+"""
+Dispatcher - Hands work from the BLE loop thread to the server context without blocking it
+"""
+
+import threading
+from collections import deque
+
+class Dispatcher:
+    """Producers only append to a deque (atomic, no lock); one consumer drains it in batches"""
+
+    def __init__(self, socketio, async_mode='threading', batch_handler=None, max_batch=500):
+        self.socketio = socketio
+        self.async_mode = async_mode
+        self.batch_handler = batch_handler  # publish() items, ek list mein
+        self.max_batch = max_batch
+        self._pending = deque()
+        self._signalled = False
+        self._started = False
+        self._wake = None
+        self._async = None
+
+    def start(self):
+        if self.async_mode == 'gevent':
+            from gevent import get_hub
+            from gevent.event import Event
+
+            # libev async watcher: send() kisi bhi OS thread se safe hai, callback hub par chalta hai.
+            # Watcher hamesha active rehta hai taake drain ke dauran aaya signal zaya na ho
+            self._wake = Event()
+            self._async = get_hub().loop.async_()
+            self._async.start(self._wake.set)
+        else:
+            # Threading mode: apna consumer thread, BLE callback sirf enqueue karta hai
+            self._wake = threading.Event()
+        self.socketio.start_background_task(self._run)
+        self._started = True
+
+    def submit(self, func, *args):
+        """Run func(*args) in the server context (inline until start() is called)"""
+        if not self._started:
+            return func(*args)
+        self._pending.append((func, args))
+        self._signal()
+
+    def publish(self, item):
+        """Queue an item for batch_handler; consecutive items are delivered as one list"""
+        if not self._started:
+            return self.batch_handler([item])
+        # Koi item drop nahi hota (readings durable store tak pohanchni chahiye); peeche ho to
+        # batch_handler fan-out kam karta hai (len(dispatcher) dekh kar)
+        self._pending.append((None, item))
+        self._signal()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def call_blocking(self, func, *args):
+        """Run a blocking call (SQLite, flush waits) without stalling the gevent hub"""
+        if self.async_mode == 'gevent':
+            from gevent import get_hub
+
+            # Native threadpool: hub baqi websockets serve karta rehta hai
+            return get_hub().threadpool.apply(func, args)
+        return func(*args)
+
+    def _signal(self):
+        # Sirf pehla producer jagata hai; baqi items usi drain mein nikal jate hain
+        if not self._signalled:
+            self._signalled = True
+            if self._async is not None:
+                self._async.send()
+            else:
+                self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            # Flag pehle clear karein taake drain ke dauran aane wala kaam bhi signal kare
+            self._signalled = False
+            self._drain()
+
+    def _drain(self):
+        batch = []
+        while self._pending:
+            func, args = self._pending.popleft()
+            if func is None:
+                batch.append(args)
+                if len(batch) < self.max_batch:
+                    continue
+            # Order barqarar: pehle jama shuda items, phir ye call
+            if batch:
+                self._call(self.batch_handler, batch)
+                batch = []
+            if func is not None:
+                self._call(func, *args)
+        if batch:
+            self._call(self.batch_handler, batch)
+
+    @staticmethod
+    def _call(func, *args):
+        try:
+            func(*args)
+        except Exception as e:
+            print(f"   ⚠️ Dispatch error: {e}")
@@ -0,0 +1,111 @@
+"""
+Export Sync Engine - Feeds one exporter from the reading store using a persisted high-water mark
+"""
+
+import time
+from datetime import datetime
+from outbound_queue import OutboundQueue
+from metrics import metrics
+
+class ExportSync:
+    """One worker per sink: own queue, batching and backoff; resumes after restarts/outages"""
+
+    def __init__(self, store, exporter, on_change=None):
+        self.store = store
+        self.exporter = exporter
+        self.name = exporter.name  # cursor key in sync_state
+        self.on_change = on_change  # status badla (connect / sync)
+        self.last_sync = None
+        self._notify_ns = {}  # seq -> notify stamp; reading.stamps emit ke baad hat jate hain
+
+        self.synced_seq = store.get_cursor(self.name)
+        if self.synced_seq is None:
+            # Pehli dafa: jo history pehle se hai use dobara export nahi karte
+            self.synced_seq = store.last_seq
+            store.set_cursor(self.name, self.synced_seq)
+
+        start_after = self.synced_seq
+        if not exporter.append_mode:
+            # Single row jaise sinks mein sirf latest reading maayne rakhti hai
+            start_after = max(start_after, store.last_seq - 1)
+        self.queue = OutboundQueue(store, maxsize=exporter.queue_size, start_after=start_after)
+        if store.last_seq > start_after:
+            print(f"   📤 {self.name} backlog: {store.last_seq - start_after} reading(s) after seq {start_after}")
+
+    def put(self, reading):
+        stamps = reading.stamps
+        if stamps and 'notify' in stamps:
+            if len(self._notify_ns) >= self.exporter.queue_size:
+                self._notify_ns.clear()  # latency sirf sample hai; spill / backlog par purane stamps chhor dein
+            self._notify_ns[reading.seq] = stamps['notify']
+        self.queue.put(reading)
+
+    def _notify(self):
+        if self.on_change:
+            self.on_change()
+
+    def run(self, is_running):
+        """Worker loop: lazy connect, one sink call per batch, exponential backoff on failure"""
+        exporter = self.exporter
+        delay = 0
+        failures = 0
+        while is_running():
+            try:
+                time.sleep(delay)
+                delay = exporter.interval
+
+                # Startup par network na ho to bhi system chalta rahe, connection baad mein
+                if not exporter.initialized:
+                    if not exporter.initialize():
+                        failures += 1
+                        delay = self._backoff(failures)
+                        print(f"   ⏳ {self.name} unavailable, retry in {delay:.0f}s")
+                        continue
+                    failures = 0
+                    self._notify()
+
+                batch = self.queue.get_batch(exporter.batch_size)
+                if not batch:
+                    continue  # Kuch naya nahi, sink call bhi nahi
+
+                try:
+                    saved = exporter.save_readings(batch)
+                except Exception as e:
+                    # Sink ne exception di (e.g. CSV encode error): batch zaya na ho, neeche requeue
+                    print(f"   ⚠️ {self.name} export error: {e}")
+                    saved = False
+
+                if saved:
+                    failures = 0
+                    self.synced_seq = batch[-1].seq
+                    self.store.set_cursor(self.name, self.synced_seq)
+                    committed = time.perf_counter_ns()
+                    for reading in batch:
+                        notified = self._notify_ns.pop(reading.seq, None)
+                        if notified is not None:  # disk se aayi readings ke stamps nahi hote
+                            metrics.observe(f"notify_to_{self.name}", (committed - notified) / 1e6)
+
+                    # Backlog baqi hai to intezar kiye baghair agla batch
+                    if len(self.queue):
+                        delay = 0
+
+                    self.last_sync = datetime.now().strftime("%H:%M:%S")
+                    self._notify()
+                else:
+                    # Fail hua (outage / quota) to readings wapas queue mein, exponential backoff
+                    self.queue.requeue(batch)
+                    failures += 1
+                    delay = self._backoff(failures)
+                    print(f"   ⏳ {self.name} retry in {delay:.0f}s ({len(self.queue)} pending)")
+            except Exception as e:
+                print(f"   ⚠️ {self.name} sync error: {e}")
+        exporter.close()
+
+    def _backoff(self, failures):
+        return min(self.exporter.max_backoff, self.exporter.interval * 2 ** failures)
+
+    def status(self):
+        return {
+            'connected': self.exporter.initialized,
+            'last_sync': self.last_sync
+        }
@@ -0,0 +1,218 @@
+"""
+Exporters - Pluggable reading sinks (Sheets, CSV, SQLite, HTTP webhook, MQTT)
+"""
+
+import csv
+import os
+import sqlite3
+import urllib.request
+from config import Config
+import json_codec
+
+class Exporter:
+    """Sink interface: initialize() is retried until True, save_readings(batch) returns success"""
+
+    name = None
+    append_mode = True  # False = sirf latest reading chahiye (single row)
+    batch_size = Config.EXPORT_BATCH_SIZE
+    interval = Config.EXPORT_SYNC_INTERVAL
+    queue_size = Config.EXPORT_QUEUE_SIZE
+    max_backoff = Config.EXPORT_MAX_BACKOFF
+
+    def __init__(self):
+        self.initialized = False
+
+    def initialize(self):
+        self.initialized = True
+        return True
+
+    def save_readings(self, readings):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+CSV_HEADERS = ['seq', 'date', 'time', 'temperature_c', 'temperature_f', 'device', 'mac_address', 'status', 'timestamp', 'source']
+
+class CsvExporter(Exporter):
+    """Appends rows to Config.CSV_FILE (header written once for a new file)"""
+
+    name = 'csv'
+
+    def __init__(self, path=None):
+        super().__init__()
+        self.path = path or Config.CSV_FILE
+
+    def save_readings(self, readings):
+        try:
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(CSV_HEADERS)
+                writer.writerows(self._to_row(reading) for reading in readings)
+            return True
+        except OSError as e:
+            print(f"   ❌ CSV export error: {e}")
+            return False
+
+    @staticmethod
+    def _to_row(reading):
+        moment = reading.moment
+        return [
+            reading.seq,
+            moment.strftime("%Y-%m-%d"),
+            moment.strftime("%H:%M:%S"),
+            f"{reading.temperature_c:.1f}",
+            f"{reading.temperature_f:.1f}",
+            reading.device,
+            reading.mac_address,
+            reading.status,
+            moment.isoformat(),
+            reading.source
+        ]
+
+class SqliteExporter(Exporter):
+    """Copies readings into a separate SQLite file (e.g. on a share or USB disk)"""
+
+    name = 'sqlite'
+
+    def __init__(self, path=None):
+        super().__init__()
+        self.path = path or Config.EXPORT_SQLITE_FILE
+        self.conn = None
+
+    def initialize(self):
+        try:
+            # Sirf is exporter ka worker thread connection use karta hai
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS readings (
+                    seq INTEGER PRIMARY KEY,
+                    epoch_ms INTEGER NOT NULL,
+                    mac_address TEXT,
+                    device TEXT,
+                    temperature_c REAL NOT NULL,
+                    status TEXT,
+                    source TEXT
+                )
+            """)
+            self.initialized = True
+            return True
+        except sqlite3.Error as e:
+            print(f"   ❌ SQLite export error: {e}")
+            return False
+
+    def save_readings(self, readings):
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO readings "
+                    "(seq, epoch_ms, mac_address, device, temperature_c, status, source) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(r.seq, r.epoch_ms, r.mac_address, r.device, r.temperature_c, r.status, r.source)
+                     for r in readings]
+                )
+            return True
+        except sqlite3.Error as e:
+            print(f"   ❌ SQLite export error: {e}")
+            return False
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+
+class WebhookExporter(Exporter):
+    """POSTs each batch as a JSON array of readings to Config.WEBHOOK_URL"""
+
+    name = 'webhook'
+
+    def __init__(self, url=None):
+        super().__init__()
+        self.url = url or Config.WEBHOOK_URL
+
+    def initialize(self):
+        if not self.url:
+            print("   ❌ WEBHOOK_URL not configured")
+            return False
+        self.initialized = True
+        return True
+
+    def save_readings(self, readings):
+        # Readings ka cached JSON hi body banta hai, dobara serialize nahi hota
+        body = json_codec.encode_list(reading.to_json() for reading in readings).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, method='POST',
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=Config.WEBHOOK_TIMEOUT) as response:
+                return 200 <= response.status < 300
+        except Exception as e:
+            print(f"   ❌ Webhook export error: {e}")
+            return False
+
+class MqttExporter(Exporter):
+    """Publishes every reading to Config.MQTT_TOPIC (needs: pip install paho-mqtt)"""
+
+    name = 'mqtt'
+
+    def __init__(self):
+        super().__init__()
+        self.client = None
+
+    def initialize(self):
+        try:
+            import paho.mqtt.client as mqtt
+        except ImportError:
+            print("   ❌ MQTT export needs paho-mqtt (pip install paho-mqtt)")
+            return False
+        try:
+            self.client = mqtt.Client()
+            self.client.connect(Config.MQTT_HOST, Config.MQTT_PORT)
+            self.client.loop_start()
+            self.initialized = True
+            return True
+        except Exception as e:
+            print(f"   ❌ MQTT connect error: {e}")
+            return False
+
+    def save_readings(self, readings):
+        try:
+            infos = [self.client.publish(f"{Config.MQTT_TOPIC}/{reading.mac_address or reading.device}",
+                                         reading.to_json(), qos=1)
+                     for reading in readings]
+            for info in infos:
+                info.wait_for_publish(timeout=Config.WEBHOOK_TIMEOUT)
+            return all(info.is_published() for info in infos)
+        except Exception as e:
+            print(f"   ❌ MQTT export error: {e}")
+            return False
+
+    def close(self):
+        if self.client:
+            self.client.loop_stop()
+            self.client.disconnect()
+
+def _sheets_exporter():
+    # gspread sirf tab import ho jab Sheets export on ho
+    from google_sheets import GoogleSheetsHandler
+    return GoogleSheetsHandler()
+
+EXPORTERS = {
+    'sheets': _sheets_exporter,
+    'csv': CsvExporter,
+    'sqlite': SqliteExporter,
+    'webhook': WebhookExporter,
+    'mqtt': MqttExporter,
+}
+
+def create_exporters(names):
+    """Instantiate the configured sinks by name (unknown names are reported and skipped)"""
+    exporters = []
+    for name in names:
+        factory = EXPORTERS.get(name)
+        if factory is None:
+            print(f"   ⚠️ Unknown exporter '{name}' (available: {', '.join(EXPORTERS)})")
+            continue
+        exporters.append(factory())
+    return exporters
@@ -0,0 +1,74 @@
+"""
+Fake Sheets Backend - In-process stand-in for a gspread Worksheet (offline runs and benchmarks)
+"""
+
+import time
+from config import Config
+
+class FakeWorksheet:
+    """Implements the Worksheet calls GoogleSheetsHandler makes, with simulated API latency"""
+
+    def __init__(self, title=None, latency=None):
+        self.title = title or Config.WORKSHEET_NAME
+        self.latency = Config.FAKE_SHEETS_LATENCY if latency is None else latency
+        self.rows = []
+        self.api_calls = 0
+
+    def _call(self):
+        self.api_calls += 1
+        if self.latency:
+            time.sleep(self.latency)  # har API call ka network round trip
+
+    def _set_row(self, number, values):
+        while len(self.rows) < number:
+            self.rows.append([])
+        self.rows[number - 1] = list(values)
+
+    @staticmethod
+    def _first_row(cell_range):
+        start = cell_range.split(':')[0]
+        return int(''.join(ch for ch in start if ch.isdigit()) or 1)
+
+    def row_values(self, number):
+        self._call()
+        return list(self.rows[number - 1]) if number <= len(self.rows) else []
+
+    def update(self, cell_range, values, **kwargs):
+        self._call()
+        first = self._first_row(cell_range)
+        for offset, row in enumerate(values):
+            self._set_row(first + offset, row)
+
+    def batch_update(self, data, **kwargs):
+        self._call()
+        for item in data:
+            first = self._first_row(item['range'])
+            for offset, row in enumerate(item['values']):
+                self._set_row(first + offset, row)
+
+    def append_rows(self, values, **kwargs):
+        self._call()
+        self.rows.extend(list(row) for row in values)
+
+    def format(self, cell_range, fmt):
+        self._call()
+
+    def clear(self):
+        self._call()
+        self.rows = []
+
+class FakeSpreadsheet:
+    """Spreadsheet stand-in: worksheet() / add_worksheet() like gspread"""
+
+    def __init__(self, latency=None):
+        self.latency = latency
+        self.worksheets = {}
+
+    def worksheet(self, title):
+        if title not in self.worksheets:
+            raise KeyError(f"worksheet not found: {title}")
+        return self.worksheets[title]
+
+    def add_worksheet(self, title, rows=100, cols=10):
+        self.worksheets[title] = FakeWorksheet(title, self.latency)
+        return self.worksheets[title]
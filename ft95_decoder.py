@@ -0,0 +1,208 @@
+"""
+FT95 Decoder - Health Thermometer (0x2A1C) frames, one at a time (live) or many in one pass (memory, replay)
+"""
+
+import struct
+from datetime import datetime, timedelta
+import numpy as np
+from config import Config
+from reading import Reading
+
+# Temperature Measurement (0x2A1C) flags
+FLAG_FAHRENHEIT = 0x01
+FLAG_TIMESTAMP = 0x02
+FLAG_TEMPERATURE_TYPE = 0x04
+FLAGS_RESERVED = 0xF8
+
+# IEEE-11073 32-bit FLOAT special mantissas (NaN, NRes, +INF, -INF, reserved)
+FLOAT_SPECIAL = {0x7FFFFF: 'NaN', 0x800000: 'NRes', 0x7FFFFE: '+INF', 0x800002: '-INF', 0x800001: 'reserved'}
+
+TEMPERATURE_TYPES = {
+    1: 'Armpit', 2: 'Body', 3: 'Ear', 4: 'Finger', 5: 'Gastro-intestinal',
+    6: 'Mouth', 7: 'Rectum', 8: 'Toe', 9: 'Tympanum'
+}
+
+_FLOAT = struct.Struct('<I')
+_TIMESTAMP = struct.Struct('<HBBBBB')  # year, month, day, hours, minutes, seconds
+_EPOCH = datetime(1970, 1, 1)
+
+class FrameError(ValueError):
+    """Corrupt or implausible frame; it is dropped before reaching the system"""
+
+class DecodedFrames:
+    """Column arrays for N 0x2A1C frames; rows with valid == False would raise FrameError one at a time"""
+
+    __slots__ = ('temperature_c', 'device_epoch_ms', 'temperature_type', 'valid')
+
+    def __init__(self, temperature_c, device_epoch_ms, temperature_type, valid):
+        self.temperature_c = temperature_c
+        self.device_epoch_ms = device_epoch_ms  # -1 = frame had no (or an unset) timestamp
+        self.temperature_type = temperature_type  # TEMPERATURE_TYPES code, 0 = not sent
+        self.valid = valid
+
+    def __len__(self):
+        return len(self.temperature_c)
+
+def check_range(temperature_c):
+    """Reject physically implausible values (Config.VALID_TEMP_MIN_C..VALID_TEMP_MAX_C)"""
+    if not Config.VALID_TEMP_MIN_C <= temperature_c <= Config.VALID_TEMP_MAX_C:
+        raise FrameError(f"{temperature_c}°C outside {Config.VALID_TEMP_MIN_C}-{Config.VALID_TEMP_MAX_C}°C")
+    return temperature_c
+
+def frame_size(flags):
+    """Bytes a 0x2A1C frame with these flags must have"""
+    return 5 + (7 if flags & FLAG_TIMESTAMP else 0) + (1 if flags & FLAG_TEMPERATURE_TYPE else 0)
+
+def parse_float(data, offset):
+    """IEEE-11073 FLOAT: 24-bit signed mantissa, 8-bit signed base-10 exponent"""
+    raw, = _FLOAT.unpack_from(data, offset)
+    mantissa = raw & 0xFFFFFF
+    if mantissa in FLOAT_SPECIAL:
+        raise FrameError(f"FLOAT {FLOAT_SPECIAL[mantissa]}")
+    if mantissa & 0x800000:
+        mantissa -= 0x1000000
+    exponent = (raw >> 24) - 256 if raw >> 31 else raw >> 24
+    # Division se 36.8 exact rehta hai (368 * 10**-1 = 36.800000000000004)
+    return mantissa / 10 ** -exponent if exponent < 0 else mantissa * 10 ** exponent
+
+def parse_timestamp(data, offset):
+    """Date Time (7 bytes) -> epoch ms in local time; None if the device clock is unset"""
+    year, month, day, hours, minutes, seconds = _TIMESTAMP.unpack_from(data, offset)
+    if year == 0 or month == 0 or day == 0:
+        return None  # spec: 0 = not known
+    try:
+        return int(datetime(year, month, day, hours, minutes, seconds).timestamp() * 1000)
+    except ValueError as e:
+        raise FrameError(f"bad timestamp: {e}")
+
+def parse_temperature_measurement(data):
+    """0x2A1C frame -> (temperature_c, device_epoch_ms or None, temperature_type or None)"""
+    if len(data) < 5:
+        raise FrameError(f"short frame ({len(data)} bytes)")
+    flags = data[0]
+    if flags & FLAGS_RESERVED:
+        raise FrameError(f"reserved flag bits set (0x{flags:02x})")
+    expected = frame_size(flags)
+    if len(data) < expected:
+        raise FrameError(f"truncated frame ({len(data)} of {expected} bytes)")
+
+    value = parse_float(data, 1)
+    temperature_c = round((value - 32) * 5 / 9, 2) if flags & FLAG_FAHRENHEIT else value
+
+    offset = 5
+    device_epoch_ms = None
+    if flags & FLAG_TIMESTAMP:
+        device_epoch_ms = parse_timestamp(data, offset)
+        offset += 7
+    temperature_type = None
+    if flags & FLAG_TEMPERATURE_TYPE:
+        temperature_type = TEMPERATURE_TYPES.get(data[offset])
+        if temperature_type is None:
+            raise FrameError(f"unknown temperature type {data[offset]}")
+    return check_range(temperature_c), device_epoch_ms, temperature_type
+
+def _frame_dtype(flags):
+    """Fixed layout of a 0x2A1C frame for one flags value"""
+    fields = [('flags', 'u1'), ('value', '<u4')]
+    if flags & FLAG_TIMESTAMP:
+        fields += [('year', '<u2'), ('month', 'u1'), ('day', 'u1'), ('hours', 'u1'), ('minutes', 'u1'), ('seconds', 'u1')]
+    if flags & FLAG_TEMPERATURE_TYPE:
+        fields.append(('type', 'u1'))
+    return np.dtype(fields)
+
+def _decode_values(raw):
+    """Vectorized parse_float + special-value mask"""
+    raw = raw.astype(np.int64)
+    mantissa = raw & 0xFFFFFF
+    special = np.isin(mantissa, list(FLOAT_SPECIAL))
+    mantissa = np.where(mantissa & 0x800000, mantissa - 0x1000000, mantissa)
+    exponent = (raw >> 24).astype(np.uint8).view(np.int8).astype(np.int64)
+    # parse_float jaisa: negative exponent par division (36.8 exact)
+    value = np.where(exponent < 0, mantissa / 10.0 ** np.abs(exponent), mantissa * 10.0 ** np.maximum(exponent, 0))
+    return value, special
+
+def _decode_timestamps(rows):
+    """Vectorized parse_timestamp -> (epoch ms or -1, bad mask)"""
+    year, month, day = (rows[name].astype(np.int64) for name in ('year', 'month', 'day'))
+    hours, minutes, seconds = (rows[name].astype(np.int64) for name in ('hours', 'minutes', 'seconds'))
+    unset = (year == 0) | (month == 0) | (day == 0)
+    bad = ~unset & ((year > 9999) | (month > 12) | (day > 31) | (hours > 23) | (minutes > 59) | (seconds > 59))
+    ok = ~unset & ~bad
+
+    months = (np.where(ok, year, 1970) - 1970) * 12 + np.where(ok, month, 1) - 1
+    days = months.astype('M8[M]').astype('M8[D]') + (np.where(ok, day, 1) - 1).astype('m8[D]')
+    # 31 February jaisi dates agle mahine mein chali jati hain: datetime() inhein reject karta hai
+    bad |= ok & (days.astype('M8[M]').astype(np.int64) != months)
+    ok &= ~bad
+
+    naive_s = days.astype(np.int64) * 86400 + hours * 3600 + minutes * 60 + seconds
+    # Device clock local time hai: UTC offset har ghante ke liye ek dafa (DST ghante ki hadd par badalta hai)
+    epoch_ms = np.full(len(rows), -1, dtype=np.int64)
+    if ok.any():
+        hour_index, inverse = np.unique(naive_s[ok] // 3600, return_inverse=True)
+        offsets = np.array([(_EPOCH + timedelta(hours=int(hour))).timestamp() - int(hour) * 3600
+                            for hour in hour_index])
+        epoch_ms[ok] = ((naive_s[ok] + offsets[inverse]) * 1000).astype(np.int64)
+    return epoch_ms, bad
+
+def decode_frames(frames):
+    """Decode many 0x2A1C frames in one pass per flags value (same rules as parse_temperature_measurement)"""
+    count = len(frames)
+    temperature_c = np.zeros(count)
+    device_epoch_ms = np.full(count, -1, dtype=np.int64)
+    temperature_type = np.zeros(count, dtype=np.uint8)
+    valid = np.zeros(count, dtype=bool)
+
+    groups = {}
+    for index, data in enumerate(frames):
+        if len(data) >= 5 and len(data) >= frame_size(data[0]):
+            groups.setdefault(data[0], []).append(index)
+
+    for flags, indexes in groups.items():
+        if flags & FLAGS_RESERVED:
+            continue
+        size = frame_size(flags)
+        indexes = np.array(indexes)
+        rows = np.frombuffer(b''.join(bytes(frames[index][:size]) for index in indexes), dtype=_frame_dtype(flags))
+
+        value, ok = _decode_values(rows['value'])
+        ok = ~ok
+        if flags & FLAG_FAHRENHEIT:
+            value = np.round((value - 32) * 5 / 9, 2)
+        if flags & FLAG_TIMESTAMP:
+            stamps, bad = _decode_timestamps(rows)
+            device_epoch_ms[indexes] = stamps
+            ok &= ~bad
+        if flags & FLAG_TEMPERATURE_TYPE:
+            temperature_type[indexes] = rows['type']
+            ok &= np.isin(rows['type'], list(TEMPERATURE_TYPES))
+        ok &= (value >= Config.VALID_TEMP_MIN_C) & (value <= Config.VALID_TEMP_MAX_C)
+        temperature_c[indexes] = value
+        valid[indexes] = ok
+    return DecodedFrames(temperature_c, device_epoch_ms, temperature_type, valid)
+
+def readings_from_frames(decoded, device=None, mac_address=None, status='Stored', source='MEMORY', require_time=True):
+    """Valid decoded rows -> Reading objects (device clock as epoch; rows without one skipped if require_time)"""
+    rows = decoded.valid & (decoded.device_epoch_ms >= 0) if require_time else decoded.valid
+    readings = []
+    for temperature_c, device_epoch_ms, code in zip(decoded.temperature_c[rows].tolist(),
+                                                    decoded.device_epoch_ms[rows].tolist(),
+                                                    decoded.temperature_type[rows].tolist()):
+        device_epoch_ms = device_epoch_ms if device_epoch_ms >= 0 else None
+        readings.append(Reading(
+            temperature_c, device_epoch_ms, device, mac_address, status=status, source=source,
+            device_epoch_ms=device_epoch_ms, temperature_type=TEMPERATURE_TYPES.get(code)
+        ))
+    return readings
+
+def decode_packet(data):
+    """Single vendor (0xFFF4) notification -> °C: flags, temperature x10 (uint16 LE), 2 trailing bytes"""
+    if len(data) < 3:
+        raise FrameError(f"short frame ({len(data)} bytes)")
+    return check_range(int.from_bytes(data[1:3], 'little') / 10.0)
+
+def decode_notification(data, vendor=False):
+    """Live notification -> (temperature_c, device_epoch_ms, temperature_type); raises FrameError"""
+    if vendor:
+        return decode_packet(data), None, None
+    return parse_temperature_measurement(data)
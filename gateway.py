@@ -0,0 +1,109 @@
+"""
+BLE Gateway - One event loop driving many FT95 thermometers
+"""
+
+import asyncio
+from ble_scanner import AdvertisementScanner
+from thermometer import FT95Thermometer
+
+class FT95Gateway:
+    """Registry of FT95 thermometers keyed by MAC, all served from one asyncio loop"""
+
+    def __init__(self, callback, state_callback=None, batch_callback=None, scanning_mode='active'):
+        self.callback = callback
+        self.state_callback = state_callback
+        self.batch_callback = batch_callback
+        self.scanner = AdvertisementScanner(scanning_mode=scanning_mode)
+        self.devices = {}
+        self.loop = None
+        self.running = False
+        self._tasks = {}
+
+    def add_device(self, mac_address, device_name, update_interval, ward=None):
+        """Register a thermometer (safe to call before or after run())"""
+        mac_address = mac_address.upper()
+        if mac_address in self.devices:
+            return self.devices[mac_address]
+
+        thermometer = FT95Thermometer(
+            mac_address=mac_address,
+            device_name=device_name,
+            update_interval=update_interval,
+            scanner=self.scanner,
+            ward=ward,
+            state_callback=self.state_callback,
+            batch_callback=self.batch_callback
+        )
+        self.devices[mac_address] = thermometer
+
+        # Gateway pehle se chal raha hai to task loop thread par start karein
+        if self.loop and self.running:
+            self.loop.call_soon_threadsafe(self._start_device_task, thermometer)
+        return thermometer
+
+    def run(self):
+        """Own a single long-lived event loop (blocking, use as thread target)"""
+        self.running = True
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            # Ek scanner sab devices ke liye, har device ka apna connect task
+            self._tasks['__scanner__'] = self.loop.create_task(self.scanner.run_forever())
+            for thermometer in self.devices.values():
+                self.scanner.watch(thermometer.mac_address)
+                self._start_device_task(thermometer)
+            print(f"   📡 BLE gateway running for {len(self.devices)} device(s)")
+            self.loop.run_forever()
+        finally:
+            self._cancel_tasks()
+            self.loop.close()
+
+    def stop(self):
+        self.running = False
+        if self.loop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def _start_device_task(self, thermometer):
+        if thermometer.mac_address in self._tasks:
+            return
+        self._tasks[thermometer.mac_address] = self.loop.create_task(
+            self._device_worker(thermometer)
+        )
+
+    def _cancel_tasks(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self._tasks.clear()
+
+    async def _device_worker(self, thermometer):
+        """Keep one device session alive; a failure only restarts this device"""
+        while self.running:
+            try:
+                await thermometer.continuous_real_read(self.callback, thermometer.update_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"   ⚠️ {thermometer.device_name} worker error: {e}")
+            thermometer.connected = False
+            await asyncio.sleep(1)
+
+    def get_device_status(self):
+        """Per-device state keyed by MAC"""
+        return {
+            mac: {
+                'device': thermometer.device_name,
+                'mac_address': mac,
+                'ward': thermometer.ward,
+                'connected': thermometer.connected,
+                'last_connect_ms': thermometer.last_connect_ms,
+                'rejected_frames': thermometer.rejected_frames,
+                'stored_downloaded': thermometer.stored_downloaded,
+                'battery': thermometer.battery,
+                'unit': thermometer.unit,
+                'status': 'Online' if thermometer.connected else 'Searching...'
+            }
+            for mac, thermometer in self.devices.items()
+        }
@@ -1,47 +1,71 @@
 """
-Google Sheets Integration - Single Row Update
+Google Sheets Integration - Single Row Update or Batched Append
 """
 
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime
 from config import Config
+from exporters import Exporter
+from fake_sheets import FakeSpreadsheet
 
-class GoogleSheetsHandler:
-    """Google Sheets handler with SINGLE ROW update"""
+HEADERS = [
+    '📅 DATE', '⏰ TIME', '🌡️ TEMP (°C)', '🌡️ TEMP (°F)', 
+    '📱 DEVICE', '🔗 STATUS', '🕒 TIMESTAMP', '📊 SOURCE'
+]
+
+class GoogleSheetsHandler(Exporter):
+    """Google Sheets handler: SINGLE ROW update (row 2) or batched APPEND of full history"""
+    
+    name = 'google_sheets'  # sync cursor naam (purane cursor ke saath compatible)
+    batch_size = Config.SHEETS_BATCH_SIZE
+    interval = Config.SHEETS_SYNC_INTERVAL
+    queue_size = Config.SHEETS_QUEUE_SIZE
+    max_backoff = Config.SHEETS_MAX_BACKOFF
     
     def __init__(self):
         self.client = None
         self.sheet = None
         self.initialized = False
-        self.current_row = 2  # Always update row 2
+        self.current_row = 2  # Always update row 2 (single row mode)
+        self.append_mode = not Config.SINGLE_ROW_UPDATE
+        self._last_row = None  # last row written in single row mode
     
     def initialize(self):
         """Initialize Google Sheets connection"""
         try:
-            print(f"   📊 Connecting to Google Sheets...")
-            
-            # Define scope
-            scope = [
-                "https://spreadsheets.google.com/feeds",
-                "https://www.googleapis.com/auth/drive"
-            ]
-            
-            # Authenticate
-            creds = ServiceAccountCredentials.from_json_keyfile_name(
-                Config.GOOGLE_CREDENTIALS_FILE, 
-                scope
-            )
-            
-            self.client = gspread.authorize(creds)
-            
-            # Open spreadsheet
-            spreadsheet = self.client.open_by_key(Config.GOOGLE_SHEET_ID)
+            if Config.SHEETS_BACKEND == 'fake':
+                # Offline stand-in: baqi sara code path wahi rehta hai
+                print("   📊 Using in-process fake Sheets backend")
+                spreadsheet = FakeSpreadsheet()
+            else:
+                print(f"   📊 Connecting to Google Sheets...")
+                
+                # Define scope
+                scope = [
+                    "https://spreadsheets.google.com/feeds",
+                    "https://www.googleapis.com/auth/drive"
+                ]
+                
+                # Authenticate
+                creds = ServiceAccountCredentials.from_json_keyfile_name(
+                    Config.GOOGLE_CREDENTIALS_FILE, 
+                    scope
+                )
+                
+                self.client = gspread.authorize(creds)
+                
+                # Open spreadsheet
+                spreadsheet = self.client.open_by_key(Config.GOOGLE_SHEET_ID)
             
             # Get or create worksheet
             try:
                 self.sheet = spreadsheet.worksheet(Config.WORKSHEET_NAME)
                 print(f"   ✅ Using existing worksheet: {Config.WORKSHEET_NAME}")
+                if self.append_mode:
+                    self._ensure_headers()
+                else:
+                    self._format_row(self.current_row)
             except:
                 print(f"   📝 Creating new worksheet: {Config.WORKSHEET_NAME}")
                 self.sheet = spreadsheet.add_worksheet(
@@ -49,11 +73,14 @@ class GoogleSheetsHandler:
                     rows=100,
                     cols=10
                 )
-                # Set up single row format
-                self._setup_single_row()
+                if self.append_mode:
+                    self._ensure_headers()
+                else:
+                    # Set up single row format
+                    self._setup_single_row()
             
             self.initialized = True
-            print(f"   ✅ Google Sheets ready (Single Row Mode)")
+            print(f"   ✅ Google Sheets ready ({'Append' if self.append_mode else 'Single Row'} Mode)")
             return True
             
         except Exception as e:
@@ -67,21 +94,8 @@ class GoogleSheetsHandler:
             self.sheet.clear()
             
             # Add headers
-            headers = [
-                '📅 DATE', '⏰ TIME', '🌡️ TEMP (°C)', '🌡️ TEMP (°F)', 
-                '📱 DEVICE', '🔗 STATUS', '🕒 TIMESTAMP', '📊 SOURCE'
-            ]
-            self.sheet.update('A1:H1', [headers])
-            
-            # Format header row
-            try:
-                self.sheet.format('A1:H1', {
-                    "backgroundColor": {"red": 0.2, "green": 0.6, "blue": 0.8},
-                    "horizontalAlignment": "CENTER",
-                    "textFormat": {"bold": True, "fontSize": 11}
-                })
-            except:
-                pass
+            self.sheet.update('A1:H1', [HEADERS])
+            self._format_header()
             
             # Add initial data row
             initial_data = [
@@ -90,55 +104,90 @@ class GoogleSheetsHandler:
             ]
             self.sheet.update('A2:H2', [initial_data])
             
+            # Formatting sirf ek dafa, har save par nahi
+            self._format_row(self.current_row)
+            
             print("   ✅ Single row setup complete")
             
         except Exception as e:
             print(f"   ⚠ Setup error: {e}")
     
-    def save_reading(self, reading):
-        """UPDATE SINGLE ROW (Row 2) with new reading"""
+    def _ensure_headers(self):
+        """Append mode: write and format the header row once if it is missing"""
+        try:
+            if self.sheet.row_values(1) != HEADERS:
+                self.sheet.update('A1:H1', [HEADERS])
+                self._format_header()
+                self.sheet.format('C2:D', {
+                    "horizontalAlignment": "CENTER",
+                    "textFormat": {"bold": True}
+                })
+        except Exception as e:
+            print(f"   ⚠ Header setup error: {e}")
+    
+    def _format_header(self):
+        try:
+            self.sheet.format('A1:H1', {
+                "backgroundColor": {"red": 0.2, "green": 0.6, "blue": 0.8},
+                "horizontalAlignment": "CENTER",
+                "textFormat": {"bold": True, "fontSize": 11}
+            })
+        except:
+            pass
+    
+    def _format_row(self, row):
+        """Highlight temperature and status cells of a row"""
+        try:
+            self.sheet.format(f'C{row}:D{row}', {
+                "backgroundColor": {"red": 1.0, "green": 0.9, "blue": 0.9},
+                "horizontalAlignment": "CENTER",
+                "textFormat": {"bold": True, "fontSize": 12}
+            })
+            self.sheet.format(f'F{row}', {
+                "backgroundColor": {"red": 0.9, "green": 1.0, "blue": 0.9},
+                "horizontalAlignment": "CENTER"
+            })
+        except:
+            pass
+    
+    @staticmethod
+    def _reading_to_row(reading):
+        moment = reading.moment
+        return [
+            moment.strftime("%Y-%m-%d"),               # A - Date
+            moment.strftime("%H:%M:%S"),               # B - Time
+            f"{reading.temperature_c:.1f}",            # C - °C (formatted)
+            f"{reading.temperature_f:.1f}",            # D - °F (formatted)
+            reading.device or Config.DEVICE_NAME,      # E - Device
+            reading.status,                            # F - Status
+            moment.isoformat(),                        # G - Timestamp
+            reading.source                             # H - Source
+        ]
+    
+    def save_readings(self, readings):
+        """Export a batch of readings with ONE API call (append rows, or overwrite row 2)"""
         if not self.initialized:
             print("   ⚠ Google Sheets not initialized")
             return False
+        if not readings:
+            return True
         
         try:
-            # Prepare single row data
-            row_data = [
-                reading.get('date_display', datetime.now().strftime("%Y-%m-%d")),  # A - Date
-                reading.get('time_display', datetime.now().strftime("%H:%M:%S")),  # B - Time
-                f"{reading.get('temperature_c', 0):.1f}",  # C - °C (formatted)
-                f"{reading.get('temperature_f', 32):.1f}",  # D - °F (formatted)
-                reading.get('device', Config.DEVICE_NAME),  # E - Device
-                reading.get('status', 'Connected'),        # F - Status
-                reading.get('timestamp', datetime.now().isoformat()),  # G - Timestamp
-                reading.get('source', 'REAL')              # H - Source
-            ]
-            
-            # UPDATE ONLY ROW 2 (overwrites previous)
-            self.sheet.update(f'A{self.current_row}:H{self.current_row}', [row_data])
-            
-            # Format the temperature cells
-            try:
-                # Highlight temperature cells
-                self.sheet.format(f'C{self.current_row}:D{self.current_row}', {
-                    "backgroundColor": {"red": 1.0, "green": 0.9, "blue": 0.9},
-                    "horizontalAlignment": "CENTER",
-                    "textFormat": {"bold": True, "fontSize": 12}
-                })
-                
-                # Format status based on connection
-                if reading.get('status') == 'Connected':
-                    status_color = {"red": 0.9, "green": 1.0, "blue": 0.9}  # Green
-                else:
-                    status_color = {"red": 1.0, "green": 0.9, "blue": 0.9}  # Light red
-                
-                self.sheet.format(f'F{self.current_row}', {
-                    "backgroundColor": status_color,
-                    "horizontalAlignment": "CENTER"
-                })
-            except:
-                pass
-            
+            if self.append_mode:
+                rows = [self._reading_to_row(reading) for reading in readings]
+                self.sheet.append_rows(rows, value_input_option='USER_ENTERED')
+                print(f"   ✅ Appended {len(rows)} row(s) to Google Sheets")
+                return True
+            
+            # Single row mode: sirf latest reading, aur wo bhi sirf agar badli ho
+            row_data = self._reading_to_row(readings[-1])
+            if row_data == self._last_row:
+                return True
+            self.sheet.batch_update([{
+                'range': f'A{self.current_row}:H{self.current_row}',
+                'values': [row_data]
+            }])
+            self._last_row = row_data
             print(f"   ✅ Updated Google Sheets Row {self.current_row}")
             return True
             
@@ -146,6 +195,10 @@ class GoogleSheetsHandler:
             print(f"   ❌ Google Sheets update error: {e}")
             return False
     
+    def save_reading(self, reading):
+        """Export a single reading (see save_readings)"""
+        return self.save_readings([reading])
+    
     def get_last_reading(self):
         """Get the last reading from row 2"""
         if not self.initialized:
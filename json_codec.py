@@ -0,0 +1,48 @@
+"""
+JSON Codec - orjson when installed, stdlib json otherwise; splices pre-encoded payloads
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # optional: pip install orjson
+
+class Encoded(str):
+    """JSON text that is already serialized; dumps() writes it verbatim"""
+    __slots__ = ()
+
+def _has_encoded(items):
+    return any(isinstance(item, Encoded) or (isinstance(item, (list, tuple)) and _has_encoded(item))
+               for item in items)
+
+def _dumps(obj):
+    if orjson:
+        try:
+            return orjson.dumps(obj).decode('utf-8')
+        except TypeError:
+            pass  # orjson jo types nahi jaanta (e.g. bohat bada int) wo stdlib sambhale
+    return json.dumps(obj, separators=(',', ':'))
+
+def dumps(obj, **kwargs):
+    """Compact json.dumps replacement (formatting kwargs are ignored)"""
+    if isinstance(obj, Encoded):
+        return str(obj)
+    # Socket.IO packet [event, payload]: pehle se encoded hisse dobara serialize nahi hote
+    if isinstance(obj, (list, tuple)) and _has_encoded(obj):
+        return '[' + ','.join(dumps(item) for item in obj) + ']'
+    return _dumps(obj)
+
+def loads(text, **kwargs):
+    if orjson:
+        return orjson.loads(text)
+    return json.loads(text, **kwargs)
+
+def encode(obj):
+    """Serialize once, reuse everywhere"""
+    return Encoded(dumps(obj))
+
+def encode_list(encoded_items):
+    """JSON array from already-encoded items, without re-serializing them"""
+    return Encoded('[' + ','.join(encoded_items) + ']')
@@ -0,0 +1,97 @@
+"""
+Dashboard Load Test - Holds N concurrent Socket.IO clients against a running server
+
+Usage:  python loadtest.py --url http://localhost:5000 --clients 2000 --rate 200 --hold 30
+Needs:  pip install "python-socketio[asyncio_client]"  (aiohttp)
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+import socketio
+
+class Stats:
+    def __init__(self):
+        self.connected = 0
+        self.peak = 0
+        self.failed = 0
+        self.handshakes = 0  # clients that received system_status on connect
+        self.readings = 0
+        self.connect_ms = []
+        self.errors = Counter()
+
+async def run_client(url, stats, stop):
+    client = socketio.AsyncClient(reconnection=False)
+    got_status = asyncio.Event()
+
+    @client.on('system_status')
+    async def on_status(data):
+        got_status.set()
+
+    @client.on('new_reading')
+    async def on_reading(data):
+        stats.readings += 1
+
+    started = time.perf_counter()
+    try:
+        await client.connect(url, transports=['websocket'], wait_timeout=30)
+        await asyncio.wait_for(got_status.wait(), timeout=30)
+        stats.connect_ms.append((time.perf_counter() - started) * 1000)
+        stats.handshakes += 1
+        stats.connected += 1
+        stats.peak = max(stats.peak, stats.connected)
+        await stop.wait()
+        stats.connected -= 1
+    except Exception as e:
+        stats.failed += 1
+        stats.errors[type(e).__name__] += 1
+    finally:
+        try:
+            await client.disconnect()
+        except Exception:
+            pass
+
+async def main(args):
+    stats = Stats()
+    stop = asyncio.Event()
+    tasks = []
+
+    print(f"🚀 Opening {args.clients} clients to {args.url} at {args.rate}/s...")
+    started = time.perf_counter()
+    for i in range(args.clients):
+        tasks.append(asyncio.create_task(run_client(args.url, stats, stop)))
+        if (i + 1) % args.rate == 0:
+            await asyncio.sleep(1)
+            print(f"   📈 launched {i + 1}, connected {stats.connected}, failed {stats.failed}")
+
+    # Sab connect ho jayein (ya fail), phir hold karein
+    while stats.connected + stats.failed < args.clients and time.perf_counter() - started < args.clients / args.rate + 60:
+        await asyncio.sleep(0.5)
+    print(f"   ⏳ Holding {stats.connected} connections for {args.hold}s...")
+    await asyncio.sleep(args.hold)
+    held = stats.connected
+
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    print("=" * 60)
+    print(f"Clients requested : {args.clients}")
+    print(f"Peak concurrent   : {stats.peak}")
+    print(f"Held to the end   : {held}")
+    print(f"Failed            : {stats.failed} {dict(stats.errors) if stats.errors else ''}")
+    if stats.connect_ms:
+        latencies = sorted(stats.connect_ms)
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"Handshake ms      : p50 {statistics.median(latencies):.0f}, p95 {p95:.0f}, max {latencies[-1]:.0f}")
+    print(f"Readings received : {stats.readings}")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FT95 dashboard connection load test")
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--rate', type=int, default=200, help="new connections per second")
+    parser.add_argument('--hold', type=float, default=10, help="seconds to hold all connections")
+    asyncio.run(main(parser.parse_args()))
@@ -1,116 +1,283 @@
+from config import Config
 import sys
-import signal
-import asyncio
 from threading import Thread, Lock
 import time
+from collections import deque
 from datetime import datetime
-from config import Config
-from thermometer import FT95Thermometer
-from google_sheets import GoogleSheetsHandler
+from itertools import islice
+from gateway import FT95Gateway
+from storage import ReadingStore
+from exporters import create_exporters
+from export_sync import ExportSync
+from broadcaster import Broadcaster
+from dispatcher import Dispatcher
+from status import StatusSnapshot
+from metrics import metrics
 from webserver import create_app, socketio
 
 class FT95System:
     def __init__(self):
-        self.thermometer = None
+        self.gateway = None
+        self.store = None
         self.google_sheets = None
         self.app = None
         self.running = False
         self.current_reading = None 
         self.system_start_time = datetime.now()
-        self.recent_readings = []
-        self.max_readings = 50
+        # Fixed-capacity ring buffer, newest on the right: O(1) append, no shifting
+        self.recent_readings = deque(maxlen=Config.MAX_READINGS_DISPLAY)
+        self.device_readings = {}  # MAC -> last reading
+        self.exporters = []        # ExportSync per sink, each from its own saved cursor
+        self.broadcaster = Broadcaster(socketio)
+        self.dispatcher = Dispatcher(socketio, Config.ASYNC_MODE, batch_handler=self.handle_live_readings)
+        self.emits_shed = 0  # backlog ke dauran emit na ki gayi (par store ki gayi) readings
         self.reading_lock = Lock()
+        self._status = None  # StatusSnapshot, replaced (never mutated) on state changes
+        self._uptime_refresh_pending = False
         
     def initialize(self):
         print("=" * 60)
         print("FT95 AUTO-RECONNECT SYSTEM ACTIVE")
         print("=" * 60)
-        self.thermometer = FT95Thermometer(
-            mac_address=Config.THERMOMETER_MAC_ADDRESS,
-            device_name=Config.DEVICE_NAME,
-            update_interval=Config.UPDATE_INTERVAL
+        # Har reading disk par bhi jati hai (restart ke baad history safe)
+        self.store = ReadingStore(Config.DATA_FILE, flush_interval=Config.STORE_FLUSH_INTERVAL).open()
+        self.broadcaster.last_seq = self.store.last_seq
+        
+        # Restart ke baad dashboard khali na ho: ring buffer pichli live readings se bharein
+        for reading in reversed(self.store.recent(Config.MAX_READINGS_DISPLAY, live_only=True)):
+            self.recent_readings.append(reading)
+            self.device_readings[reading.mac_address] = reading
+            self.current_reading = reading
+        
+        # Ek hi gateway (aur ek hi event loop) saare thermometers ko chalata hai
+        self.gateway = FT95Gateway(
+            callback=self._on_ble_reading,
+            state_callback=self._on_device_state,
+            batch_callback=self._on_ble_batch,
+            scanning_mode=Config.SCANNING_MODE
         )
-        if Config.GOOGLE_SHEET_ID:
-            self.google_sheets = GoogleSheetsHandler()
-            self.google_sheets.initialize()
+        for mac_address, device_name, ward in Config.get_devices():
+            self.gateway.add_device(mac_address, device_name, Config.UPDATE_INTERVAL, ward=ward)
+            self.broadcaster.wards[mac_address] = ward
+            print(f"   🌡️ Registered {device_name} ({mac_address}){f' in ward {ward}' if ward else ''}")
+        # Har exporter ka apna worker; connection worker banata hai (network na ho to baad mein retry)
+        for exporter in create_exporters(Config.get_exporters()):
+            self.exporters.append(ExportSync(self.store, exporter, on_change=self._on_export_change))
+            if exporter.name == 'google_sheets':
+                self.google_sheets = exporter
+            print(f"   📤 Exporter enabled: {exporter.name}")
         
         # Web server initialization
         self.app = create_app(self)
         self.app.config['SYSTEM'] = self
+        self.refresh_status()
         
+    def _build_status(self):
+        devices = self.gateway.get_device_status() if self.gateway else {}
+        for mac, device in devices.items():
+            last = self.device_readings.get(mac)
+            device['last_reading'] = last.to_dict() if last else None
+        connected = any(device['connected'] for device in devices.values())
+        names = [device['device'] for device in devices.values()]
+        current = self.current_reading
+        return {
+            'connected': connected,
+            'device': ", ".join(names) if names else "Disconnected",
+            'devices': devices,
+            'devices_connected': sum(1 for device in devices.values() if device['connected']),
+            'last_reading': current.to_dict() if current else None,
+            'uptime': str(datetime.now() - self.system_start_time).split('.')[0],
+            'status': 'Online' if connected else 'Searching...',
+            'last_seq': self.broadcaster.last_seq,
+            'google_sheets': bool(self.google_sheets and self.google_sheets.initialized),
+            'sheets_last_sync': self._sheets_last_sync(),
+            'exporters': {sync.name: sync.status() for sync in self.exporters},
+            'emits_shed': self.emits_shed
+        }
+
+    def refresh_status(self):
+        """Rebuild the snapshot after a state change (dispatcher only; attribute swap is atomic)"""
+        self._status = StatusSnapshot(self._build_status())
+        return self._status
+
+    def _status_snapshot(self):
+        snapshot = self._status
+        if snapshot is None:
+            snapshot = self.refresh_status()  # initialize() se pehle
+        elif not snapshot.is_fresh() and not self._uptime_refresh_pending:
+            # Sirf uptime purana hai. Rebuild dispatcher par hi, warna HTTP thread ka banaya
+            # snapshot dispatcher ke naye (connected / battery) snapshot ko purane se overwrite kar sakta hai
+            self._uptime_refresh_pending = True
+            self.dispatcher.submit(self._refresh_uptime)
+        return snapshot
+
+    def _refresh_uptime(self):
+        self._uptime_refresh_pending = False
+        self.refresh_status()
+
     # --- YE FUNCTION MISSING THA JIS SE WEB CRASH HO RAHA THA ---
     def get_status(self):
-        with self.reading_lock:
-            connected = self.thermometer.connected if self.thermometer else False
-            return {
-                'connected': connected,
-                'device': self.thermometer.device_name if self.thermometer else "Disconnected",
-                'last_reading': self.current_reading,
-                'uptime': str(datetime.now() - self.system_start_time).split('.')[0],
-                'status': 'Online' if connected else 'Searching...'
-            }
+        """Current status dict (shared snapshot - do not mutate); no locking"""
+        return self._status_snapshot().data
 
-    def get_recent_readings(self, count=10):
-        with self.reading_lock:
-            return self.recent_readings[:count]
+    def get_status_json(self):
+        """Same snapshot, already serialized for /api/status"""
+        return self._status_snapshot().json
 
-    def _google_sheets_sync_worker(self):
-        """Force Overwrite Logic for Row 2 & Web Sync"""
-        while self.running:
-            try:
-                time.sleep(5) 
-                if self.google_sheets and self.current_reading:
-                    with self.reading_lock:
-                        reading = self.current_reading.copy()
-                    
-                    # Overwrite Row 2
-                    self.google_sheets.save_reading(reading)
-                    print(f"   📊 Sheet Row 2 Updated: {reading['temperature_c']}°C")
-                    
-                    # WEB KO BHI UPDATE BHEJOIN (Just in case)
-                    socketio.emit('new_reading', reading)
-                    socketio.emit('system_status', self.get_status())
-            except Exception as e:
-                print(f"   ⚠️ Sync Error: {e}")
+    def _on_device_state(self, thermometer):
+        """BLE loop thread: a device connected or disconnected"""
+        self.dispatcher.submit(self._publish_status)
+
+    def _publish_status(self):
+        self.broadcaster.publish_status(self.refresh_status().data)
+
+    def get_recent_readings(self, count=10):
+        """Newest first; copies only `count` items and never takes reading_lock"""
+        # list(islice(reversed(deque))) poora C mein chalta hai, GIL ke andar atomic snapshot
+        return list(islice(reversed(self.recent_readings), max(0, count)))
+
+    def get_readings_since(self, seq, limit=None):
+        """Readings newer than seq, oldest first; None if the client is too far behind or ahead"""
+        limit = limit or Config.MAX_RESUME_READINGS
+        last_seq = self.broadcaster.last_seq
+        if seq > last_seq:
+            return None  # client ka seq server se aage (DATA_FILE reset): snapshot chahiye
+        if seq == last_seq:
+            return []
+        
+        # Ring buffer mein mil jayein to disk tak jane ki zaroorat nahi
+        buffered = list(self.recent_readings)
+        if buffered and buffered[0].seq <= seq + 1:
+            return [reading for reading in buffered if reading.seq > seq]
+        return self.dispatcher.call_blocking(self._stored_readings_after, seq, limit)
+
+    def _stored_readings_after(self, seq, limit):
+        if not self.store.flush():
+            return None  # disk par poori history nahi, client snapshot le
+        # Sirf live readings, ring buffer jaisi: memory download wale records (status 'Stored')
+        # na missed_readings mein jate hain na limit mein gine jate hain
+        readings = self.store.readings_after(seq, limit + 1, live_only=True)
+        return None if len(readings) > limit else readings
+
+    def _sheets_last_sync(self):
+        for sync in self.exporters:
+            if sync.exporter is self.google_sheets:
+                return sync.last_sync
+        return None
+
+    def _export_worker(self, sync):
+        """One thread per exporter (see ExportSync)"""
+        sync.run(lambda: self.running)
+
+    def _on_export_change(self):
+        # Readings dobara emit nahi karte, sirf sync time / connection (status delta)
+        self.dispatcher.submit(self._publish_status)
 
     def _run_async_worker(self):
-        """Aggressive Auto-Reconnect Loop"""
+        """Single long-lived event loop for every thermometer (per-device tasks)"""
         while self.running:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
             try:
-                # Direct call to thermometer loop
-                loop.run_until_complete(self.thermometer.continuous_real_read(self.handle_real_reading))
+                self.gateway.run()
             except Exception as e:
-                pass
-            finally:
-                loop.close()
-            time.sleep(1)
+                print(f"   ⚠️ Gateway error: {e}")
+            if self.running:
+                time.sleep(1)
+
+    def _on_ble_reading(self, reading):
+        """Called on the BLE loop thread; only enqueues (constant time, no locks, no emits)"""
+        self.dispatcher.publish(reading)
+
+    def _on_ble_batch(self, readings):
+        """BLE loop thread: stored measurements downloaded from a thermometer"""
+        self.dispatcher.submit(self.handle_reading_batch, readings)
+
+    def _known_device_times(self, mac_address, device_times):
+        flushed = self.store.flush()  # live readings bhi dedup mein shamil hon
+        return flushed, self.store.known_device_times(mac_address, device_times)
+
+    def handle_reading_batch(self, readings):
+        """Ingest downloaded measurements once (dedup by device clock), oldest first"""
+        if not readings:
+            return
+        mac_address = readings[0].mac_address
+        flushed, known = self.dispatcher.call_blocking(
+            self._known_device_times, mac_address, [reading.device_epoch_ms for reading in readings])
+        if not flushed:
+            # Abhi commit nahi huin: ring buffer se device clock le lein
+            known.update(reading.device_epoch_ms for reading in list(self.recent_readings)
+                         if reading.mac_address == mac_address)
+        fresh = {}
+        for reading in readings:
+            if reading.device_epoch_ms not in known:
+                fresh.setdefault(reading.device_epoch_ms, reading)
+        fresh = sorted(fresh.values(), key=lambda reading: reading.device_epoch_ms)
+        
+        # Live ring buffer / new_reading mein nahi, ye purani readings hain (range queries mein dikhti hain)
+        with self.reading_lock:
+            for reading in fresh:
+                self.store.append(reading)
+                for sync in self.exporters:
+                    sync.put(reading)
+        print(f"   📥 Stored {len(fresh)} downloaded reading(s), {len(readings) - len(fresh)} already known")
+        self._publish_status()
 
     def handle_real_reading(self, reading):
         if not reading: return
+        self.handle_live_readings([reading])
+
+    def handle_live_readings(self, readings):
+        """Dispatcher batch: one lock for storage, then emits, then a single status update"""
         with self.reading_lock:
-            self.current_reading = reading
-            self.recent_readings.insert(0, reading)
-            if len(self.recent_readings) > self.max_readings:
-                self.recent_readings.pop()
+            for reading in readings:
+                reading.stamp('lock')
+                self.store.append(reading)
+                for sync in self.exporters:
+                    sync.put(reading)
+                self.device_readings[reading.mac_address] = reading
+                self.recent_readings.append(reading)
+            self.current_reading = readings[-1]
         
-        # Dashboard ko foran naya data bhejien
-        socketio.emit('new_reading', reading)
-        socketio.emit('system_status', self.get_status())
+        # Dashboard ko foran naya data bhejien (sirf naye readings + badle hue status fields)
+        emitted = readings
+        if len(self.dispatcher) > Config.DISPATCH_SHED_BACKLOG:
+            # Backlog: sockets ko har device ki sirf newest reading, baqi store / ring buffer se milti hain
+            newest = {reading.mac_address: reading for reading in readings}
+            emitted = sorted(newest.values(), key=lambda reading: reading.seq)
+            self.emits_shed += len(readings) - len(emitted)
+        for reading in emitted:
+            self.broadcaster.publish_reading(reading)
+            reading.stamp('emit')
+        self._publish_status()
+        for reading in readings:
+            metrics.observe_stage(reading, 'lock')
+            metrics.observe_stage(reading, 'emit')
+            # Ring buffer mein compact record rahe; exporters notify stamp alag rakhte hain
+            reading.stamps = None
 
     def start(self):
         self.running = True
-        # Bluetooth Thread
+        self.dispatcher.start()
+        # Bluetooth Thread. gevent mode mein monkey patching nahi hoti: BLE, store writer aur exporters
+        # asli OS threads hain, sirf websockets hub par; emits dispatcher ke zariye hub par hi hote hain
         Thread(target=self._run_async_worker, daemon=True).start()
-        # Sheets Sync Thread
-        Thread(target=self._google_sheets_sync_worker, daemon=True).start()
+        # Export threads (Sheets, CSV, ...), ek slow sink doosron ko nahi rokta
+        for sync in self.exporters:
+            Thread(target=self._export_worker, args=(sync,), daemon=True).start()
         
-        print(f"🚀 Dashboard: http://localhost:{Config.PORT}")
-        socketio.run(self.app, host=Config.HOST, port=Config.PORT, debug=False, use_reloader=False, allow_unsafe_werkzeug=True)
+        print(f"🚀 Dashboard: http://localhost:{Config.PORT} ({Config.ASYNC_MODE} mode)")
+        if Config.ASYNC_MODE == 'gevent':
+            from gevent.pool import Pool
+            socketio.run(self.app, host=Config.HOST, port=Config.PORT, debug=False, use_reloader=False,
+                         spawn=Pool(Config.MAX_CONNECTIONS), log_output=False)
+        else:
+            socketio.run(self.app, host=Config.HOST, port=Config.PORT, debug=False, use_reloader=False, allow_unsafe_werkzeug=True)
 
     def stop(self):
         self.running = False
+        if self.gateway:
+            self.gateway.stop()
+        if self.store:
+            self.store.close()
         sys.exit(0)
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+"""
+Latency Metrics - Fixed-bucket histograms for the reading pipeline (served on /metrics)
+"""
+
+import math
+from threading import Lock
+
+# Log-scale bucket upper bounds: 10 us ... ~2 min, har bucket pichle se 25% bada
+BUCKET_BOUNDS_MS = [0.01 * 1.25 ** i for i in range(74)]
+QUANTILES = (50, 95, 99)
+
+class LatencyHistogram:
+    """Constant memory, O(1) observe; percentiles interpolated inside a bucket"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        ms = max(ms, 0.0)
+        index = 0 if ms <= BUCKET_BOUNDS_MS[0] else min(
+            len(BUCKET_BOUNDS_MS), math.ceil(math.log(ms / BUCKET_BOUNDS_MS[0], 1.25)))
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, pct):
+        if not self.count:
+            return None
+        rank = self.count * pct / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = BUCKET_BOUNDS_MS[index - 1] if index else 0.0
+                upper = BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else self.max_ms
+                value = lower + (upper - lower) * (rank - seen) / count
+                return round(min(value, self.max_ms), 3)
+            seen += count
+        return round(self.max_ms, 3)
+
+    def summary(self):
+        data = {'count': self.count}
+        for pct in QUANTILES:
+            data[f'p{pct}_ms'] = self.percentile(pct)
+        data['mean_ms'] = round(self.total_ms / self.count, 3) if self.count else None
+        data['max_ms'] = round(self.max_ms, 3)
+        return data
+
+class Metrics:
+    """Named latency histograms, e.g. 'notify_to_emit' or 'notify_to_google_sheets'"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = Lock()
+
+    def observe(self, name, ms):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.observe(ms)
+
+    def observe_stage(self, reading, stage, since='notify'):
+        """Record the time from one of the reading's stamps to another"""
+        stamps = reading.stamps
+        if stamps and since in stamps and stage in stamps:
+            self.observe(f"{since}_to_{stage}", (stamps[stage] - stamps[since]) / 1e6)
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def snapshot(self):
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self._histograms.items())}
+
+    def prometheus(self):
+        """Prometheus text format (summary per stage)"""
+        lines = ["# TYPE ft95_latency_ms summary"]
+        for name, data in self.snapshot().items():
+            for pct in QUANTILES:
+                value = data[f'p{pct}_ms']
+                if value is not None:
+                    lines.append(f'ft95_latency_ms{{stage="{name}",quantile="{pct / 100}"}} {value}')
+            lines.append(f'ft95_latency_ms_count{{stage="{name}"}} {data["count"]}')
+            lines.append(f'ft95_latency_ms_sum{{stage="{name}"}} {round((data["mean_ms"] or 0) * data["count"], 3)}')
+        return "\n".join(lines) + "\n"
+
+# Process-wide registry (socketio ki tarah ek hi instance)
+metrics = Metrics()
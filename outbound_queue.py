@@ -0,0 +1,77 @@
+"""
+Outbound Queue - Bounded hand-off between ingest and slow exporters
+"""
+
+from collections import deque
+from threading import Lock
+
+class OutboundQueue:
+    """Never blocks the producer; on overflow the backlog spills to the reading store"""
+
+    def __init__(self, store, maxsize=1000, start_after=None):
+        self.store = store
+        self.maxsize = maxsize
+        self._items = deque()
+        self._lock = Lock()
+        self._spilled_after = None  # seq cursor while in spill mode
+        self._taken_seq = 0  # newest seq already handed out from the store
+        if start_after is not None and start_after < store.last_seq:
+            # Pichla backlog disk par hai: wahan se shuru karein
+            self._spilled_after = start_after
+
+    def put(self, reading):
+        with self._lock:
+            if self._spilled_after is not None:
+                return  # disk par already hai, consumer wahan se uthaye ga
+            if reading.seq is not None and reading.seq <= self._taken_seq:
+                return  # store se catch up karte waqt ye pehle hi nikal chuki
+            self._items.append(reading)
+            if len(self._items) > self.maxsize:
+                self._spill()
+
+    def _spill(self):
+        """Drop memory copies and continue from the store (lock must be held)"""
+        # Har reading pehle se ReadingStore mein hai, is liye sirf cursor yaad rakhna kaafi hai
+        if self._items:
+            self._spilled_after = self._items[0].seq - 1
+            self._items.clear()
+            print(f"   💾 Outbound queue full, spilling to disk after seq {self._spilled_after}")
+
+    def get_batch(self, max_items):
+        """Take up to max_items readings, oldest first"""
+        with self._lock:
+            if self._spilled_after is None:
+                count = min(max_items, len(self._items))
+                return [self._items.popleft() for _ in range(count)]
+            after = self._spilled_after
+
+        # Spill mode: backlog ko disk se bade batches mein parhein
+        if not self.store.flush():
+            return []  # store likh nahi pa raha; cursor wahin rahe, baad mein phir koshish
+        batch = self.store.readings_after(after, max_items)
+        with self._lock:
+            if batch:
+                self._spilled_after = batch[-1].seq
+                self._taken_seq = max(self._taken_seq, batch[-1].seq)
+            # Catch up ho gaye to wapas memory fast path par
+            if self._spilled_after >= self.store.last_seq:
+                self._spilled_after = None
+        return batch
+
+    def requeue(self, batch):
+        """Put a failed batch back in front of everything else"""
+        if not batch:
+            return
+        with self._lock:
+            if self._spilled_after is not None:
+                self._spilled_after = min(self._spilled_after, batch[0].seq - 1)
+            else:
+                self._items.extendleft(reversed(batch))
+                if len(self._items) > self.maxsize:
+                    self._spill()
+
+    def __len__(self):
+        with self._lock:
+            if self._spilled_after is not None:
+                return max(0, self.store.last_seq - self._spilled_after)
+            return len(self._items)
@@ -0,0 +1,71 @@
+"""
+Reading - Compact temperature record shared by every consumer
+"""
+
+import time
+from datetime import datetime
+import json_codec
+
+class Reading:
+    """Float temperature + integer epoch timestamp; display strings are built at serialization"""
+
+    __slots__ = ('temperature_c', 'epoch_ms', 'device', 'mac_address', 'status', 'source', 'seq',
+                 'device_epoch_ms', 'temperature_type', 'stamps', '_json')
+
+    def __init__(self, temperature_c, epoch_ms=None, device=None, mac_address=None,
+                 status='Connected', source='REAL', seq=None, device_epoch_ms=None, temperature_type=None):
+        self.temperature_c = temperature_c
+        self.epoch_ms = epoch_ms if epoch_ms is not None else time.time_ns() // 1_000_000
+        self.device = device
+        self.mac_address = mac_address
+        self.status = status
+        self.source = source
+        self.seq = seq
+        self.device_epoch_ms = device_epoch_ms  # thermometer ki apni clock (agar bheje)
+        self.temperature_type = temperature_type  # e.g. 'Ear', 'Body'
+        self.stamps = None  # stage -> time.perf_counter_ns() (live readings, dropped after emit)
+        self._json = None
+
+    def stamp(self, stage, ns=None):
+        """Record a monotonic pipeline timestamp (notify, lock, emit)"""
+        if self.stamps is None:
+            self.stamps = {}
+        self.stamps[stage] = ns if ns is not None else time.perf_counter_ns()
+
+    @property
+    def temperature_f(self):
+        return (self.temperature_c * 9/5) + 32
+
+    @property
+    def moment(self):
+        """Local datetime of the reading"""
+        return datetime.fromtimestamp(self.epoch_ms / 1000)
+
+    def to_dict(self):
+        """Dashboard / API format (same keys the web and Sheets always used)"""
+        moment = self.moment
+        return {
+            'seq': self.seq,
+            'epoch_ms': self.epoch_ms,
+            'temperature_c': self.temperature_c,
+            'temperature_f': self.temperature_f,
+            'timestamp': moment.isoformat(),
+            'time_display': moment.strftime("%H:%M:%S"),
+            'date_display': moment.strftime("%Y-%m-%d"),
+            'status': self.status,
+            'device': self.device,
+            'mac_address': self.mac_address,
+            'source': self.source,
+            'device_epoch_ms': self.device_epoch_ms,
+            'temperature_type': self.temperature_type
+        }
+
+    def to_json(self):
+        """to_dict() serialized once (after the store assigns seq) and cached for every consumer"""
+        cached = self._json
+        if cached is None or cached[0] != self.seq:
+            cached = self._json = (self.seq, json_codec.encode(self.to_dict()))
+        return cached[1]
+
+    def __repr__(self):
+        return f"Reading(seq={self.seq}, {self.temperature_c}°C, {self.device}, {self.epoch_ms})"
@@ -0,0 +1,62 @@
+"""
+FT95 Simulator - Synthetic notifications for FT95Thermometer without any Bluetooth hardware
+"""
+
+import random
+import time
+from threading import Thread
+
+def ft95_packet(temperature_c, moment=None):
+    """Health Thermometer measurement: flags (Celsius) + IEEE-11073 FLOAT (exp -1) [+ Date Time if moment]"""
+    mantissa = round(temperature_c * 10)
+    packet = bytearray([0x02 if moment else 0x00]) + mantissa.to_bytes(3, 'little', signed=True) + bytearray([0xFF])
+    if moment:
+        # Stored record jaisa: device clock ka waqt saath
+        packet += moment.year.to_bytes(2, 'little') + bytearray(
+            [moment.month, moment.day, moment.hour, moment.minute, moment.second])
+    return packet
+
+class FT95Simulator:
+    """Drives notification_handler of each thermometer from its own thread at a fixed rate"""
+
+    def __init__(self, thermometers, rate=1.0, on_notify=None):
+        self.thermometers = thermometers
+        self.rate = rate  # notifications/sec per device, 0 = as fast as possible
+        self.on_notify = on_notify  # (thermometer) just before each notification
+        self.running = False
+        self._threads = []
+
+    def start(self, count=None):
+        """Start one sender per device; count limits notifications per device"""
+        self.running = True
+        self._threads = [Thread(target=self._run, args=(thermometer, count), daemon=True)
+                         for thermometer in self.thermometers]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.join()
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self, thermometer, count):
+        temperature = random.uniform(36.0, 37.5)
+        period = 1 / self.rate if self.rate else 0
+        next_time = time.perf_counter()
+        sent = 0
+        while self.running and (count is None or sent < count):
+            # Random walk, insani jism ki range mein
+            temperature = min(42.0, max(34.0, temperature + random.uniform(-0.1, 0.1)))
+            if self.on_notify:
+                self.on_notify(thermometer)
+            thermometer.notification_handler(None, ft95_packet(temperature))
+            sent += 1
+            if period:
+                next_time += period
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
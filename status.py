@@ -0,0 +1,19 @@
+"""
+Status Snapshot - Immutable, pre-serialized system status
+"""
+
+import time
+import json_codec
+
+class StatusSnapshot:
+    """Built once per state change and swapped in atomically; readers never lock"""
+
+    __slots__ = ('data', 'json', 'second')
+
+    def __init__(self, data):
+        self.data = data
+        self.json = json_codec.encode(data)
+        self.second = int(time.monotonic())  # uptime sirf is second tak sahi hai
+
+    def is_fresh(self):
+        return self.second == int(time.monotonic())
@@ -0,0 +1,240 @@
+"""
+Local Reading Store - Append-only SQLite (WAL) log of every reading
+"""
+
+import itertools
+import queue
+import sqlite3
+import threading
+import time
+from reading import Reading
+
+_STOP = object()
+MAX_RETRY_BACKOFF = 30.0  # seconds between failed commit attempts (disk full, DB locked)
+
+COLUMNS = "seq, epoch_ms, mac_address, device, temperature_c, status, source, device_epoch_ms, temperature_type"
+
+class ReadingStore:
+    """Durable reading history; writes are batched on a background thread"""
+
+    def __init__(self, path, flush_interval=1.0, batch_size=500):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.last_seq = 0
+        self.committed_seq = 0  # sab kuch is seq tak disk par hai
+        self._seq = None
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._writer_thread = None
+
+    def open(self):
+        """Create the schema and start the writer thread"""
+        conn = self._connection()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS readings (
+                seq INTEGER PRIMARY KEY,
+                epoch_ms INTEGER NOT NULL,
+                mac_address TEXT,
+                device TEXT,
+                temperature_c REAL NOT NULL,
+                status TEXT,
+                source TEXT,
+                device_epoch_ms INTEGER,
+                temperature_type TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_readings_time ON readings(epoch_ms);
+            CREATE INDEX IF NOT EXISTS idx_readings_device_time ON readings(mac_address, epoch_ms);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                name TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL
+            );
+        """)
+        # Purani DB files: naye columns add karein
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(readings)")}
+        for column, kind in (('device_epoch_ms', 'INTEGER'), ('temperature_type', 'TEXT')):
+            if column not in existing:
+                conn.execute(f"ALTER TABLE readings ADD COLUMN {column} {kind}")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_readings_device_clock ON readings(mac_address, device_epoch_ms)")
+        conn.commit()
+        self.last_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM readings").fetchone()[0]
+        self.committed_seq = self.last_seq
+        self._seq = itertools.count(self.last_seq + 1)
+
+        self._writer_thread = threading.Thread(target=self._writer, daemon=True)
+        self._writer_thread.start()
+        print(f"   💾 Reading store ready: {self.path} ({self.last_seq} readings)")
+        return self
+
+    def _connection(self):
+        """One SQLite connection per thread (WAL lets readers run beside the writer)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + FULL: har commit fsync hota hai (commit pehle se 1s / 500 rows ke batch mein hain),
+            # taake committed_seq ke baad power jaye to bhi readings aur export cursors sahi rahein
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    def append(self, reading):
+        """Queue a reading for persistence (non-blocking) and return its sequence number"""
+        seq = next(self._seq)
+        reading.seq = seq
+        self._queue.put(reading)
+        self.last_seq = seq  # put ke baad, taake flush() ka target hamesha queue mein ho
+        return seq
+
+    def flush(self, timeout=None):
+        """Block until everything appended so far is committed; False if it could not be"""
+        target = self.last_seq
+        done = threading.Event()
+        self._queue.put(done)
+        # Write fail ho to waiter phir bhi chhoot jata hai, is liye committed_seq se check karein
+        return done.wait(timeout) and self.committed_seq >= target
+
+    def close(self):
+        if self._writer_thread and self._writer_thread.is_alive():
+            self._queue.put(_STOP)
+            self._writer_thread.join(timeout=5)
+
+    def _writer(self):
+        conn = self._connection()
+        pending = []
+        waiters = []
+        deadline = None
+        retry_at = 0.0
+        backoff = 0.0
+        stopping = False
+
+        while not stopping:
+            timeout = max(0.0, deadline - time.monotonic()) if pending else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                stopping = True
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not None:
+                if not pending:
+                    deadline = time.monotonic() + self.flush_interval
+                pending.append(item)
+
+            # Batch commit: interval poora ho, batch bhar jaye, ya koi flush ka intezar kar raha ho
+            now = time.monotonic()
+            due = stopping or waiters or len(pending) >= self.batch_size or now >= deadline
+            if pending and due and (stopping or now >= retry_at):
+                if self._write(conn, pending):
+                    pending = []
+                    backoff = 0.0
+                else:
+                    # Disk full / DB locked: foran dobara koshish nahi, backoff ke baad
+                    backoff = min(max(backoff * 2, self.flush_interval), MAX_RETRY_BACKOFF)
+                    retry_at = deadline = now + backoff
+
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+
+    def _write(self, conn, readings):
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO readings ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [self._to_row(reading) for reading in readings]
+                )
+            self.committed_seq = max(self.committed_seq, readings[-1].seq)
+            return True
+        except Exception as e:
+            print(f"   ❌ Reading store write error: {e}")
+            return False
+
+    @staticmethod
+    def _to_row(reading):
+        return (
+            reading.seq,
+            reading.epoch_ms,
+            reading.mac_address,
+            reading.device,
+            reading.temperature_c,
+            reading.status,
+            reading.source,
+            reading.device_epoch_ms,
+            reading.temperature_type
+        )
+
+    @staticmethod
+    def _from_row(row):
+        seq, epoch_ms, mac_address, device, temperature_c, status, source, device_epoch_ms, temperature_type = row
+        return Reading(temperature_c, epoch_ms, device, mac_address, status, source, seq,
+                       device_epoch_ms, temperature_type)
+
+    def get_cursor(self, name):
+        """Persisted high-water mark of an exporter (None if it never ran)"""
+        row = self._connection().execute("SELECT seq FROM sync_state WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_cursor(self, name, seq):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO sync_state (name, seq) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET seq = excluded.seq",
+                (name, seq)
+            )
+
+    def readings_after(self, seq, limit=500, live_only=False):
+        """Committed readings with sequence number greater than seq, oldest first"""
+        live = "AND source IS NOT 'MEMORY' " if live_only else ""
+        rows = self._connection().execute(
+            f"SELECT {COLUMNS} FROM readings WHERE seq > ? {live}ORDER BY seq LIMIT ?",
+            (seq, limit)
+        ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def known_device_times(self, mac_address, device_times):
+        """Which of these device-clock timestamps are already stored for this thermometer"""
+        if not device_times:
+            return set()
+        rows = self._connection().execute(
+            "SELECT device_epoch_ms FROM readings "
+            "WHERE mac_address = ? AND device_epoch_ms BETWEEN ? AND ?",
+            (mac_address, min(device_times), max(device_times))
+        )
+        return {row[0] for row in rows}
+
+    def query_buckets(self, start_ms, end_ms, bucket_ms, device=None):
+        """Min/max/mean per time bucket, aggregated inside SQLite (no raw rows leave the DB)"""
+        sql = (
+            "SELECT epoch_ms / ? AS bucket, COUNT(*), MIN(temperature_c), "
+            "MAX(temperature_c), AVG(temperature_c) "
+            "FROM readings WHERE epoch_ms >= ? AND epoch_ms < ?"
+        )
+        params = [bucket_ms, start_ms, end_ms]
+        if device:
+            sql += " AND (mac_address = ? OR device = ?)"
+            params += [device.upper(), device]
+        sql += " GROUP BY bucket ORDER BY bucket"
+        
+        return [
+            {
+                'epoch_ms': bucket * bucket_ms,
+                'count': count,
+                'min_c': min_c,
+                'max_c': max_c,
+                'mean_c': round(mean_c, 2)
+            }
+            for bucket, count, min_c, max_c, mean_c in self._connection().execute(sql, params)
+        ]
+
+    def recent(self, count=10, live_only=False):
+        """Newest committed readings first (live_only skips records downloaded from device memory)"""
+        where = "WHERE source IS NOT 'MEMORY' " if live_only else ""
+        rows = self._connection().execute(
+            f"SELECT {COLUMNS} FROM readings {where}ORDER BY seq DESC LIMIT ?",
+            (count,)
+        ).fetchall()
+        return [self._from_row(row) for row in rows]
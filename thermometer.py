@@ -1,54 +1,255 @@
 import asyncio
-from datetime import datetime
+import time
 from bleak import BleakClient, BleakScanner
+from config import Config
+from reading import Reading
+from ft95_decoder import FLAG_TIMESTAMP, FrameError, decode_frames, decode_notification, readings_from_frames
 
 TEMP_CHAR_UUID = "00002a1c-0000-1000-8000-00805f9b34fb"
+HEALTH_THERMOMETER_SERVICE_UUID = "00001809-0000-1000-8000-00805f9b34fb"
+RACP_UUID = "00002a52-0000-1000-8000-00805f9b34fb"  # Record Access Control Point
+
+# RACP: "Report stored records" / "All records", response opcode and codes
+RACP_REPORT_ALL = bytes([0x01, 0x01])
+RACP_RESPONSE = 0x06
+RACP_SUCCESS = 0x01
+RACP_NO_RECORDS = 0x06
 
 class FT95Thermometer:
-    def __init__(self, mac_address, device_name, update_interval):
+    def __init__(self, mac_address, device_name, update_interval, scanner=None, ward=None,
+                 state_callback=None, batch_callback=None):
         self.mac_address = mac_address
         self.device_name = device_name
+        self.ward = ward
+        self.state_callback = state_callback
+        self.batch_callback = batch_callback  # stored measurements, ek list mein
         self.update_interval = update_interval
+        self.scanner = scanner
         self.connected = False
+        self.callback = None
+        self.client = None
+        self.last_connect_ms = None
+        self._disconnected = None
+        self._notify_uuid = None  # characteristic that worked last time
+        self.rejected_frames = 0
+        self.stored_downloaded = 0
+        self.battery = None  # percent
+        self.unit = None     # '°C' / '°F' as set on the device
+        self._info_read_at = None  # monotonic time of the last battery/unit GATT read
+        self._capture = None  # memory download ke dauran raw frames yahan jate hain
 
     def notification_handler(self, characteristic, data):
         """Handle incoming temperature data"""
+        received = time.perf_counter_ns()
+        uuid = getattr(characteristic, 'uuid', None) or self._notify_uuid
+        # Memory download: sirf waqt wale 0x2A1C records buffer mein, live reading live path par hi rahe
+        if self._capture is not None and uuid == TEMP_CHAR_UUID and data and data[0] & FLAG_TIMESTAMP:
+            self._capture.append(bytes(data))
+            return
         try:
-            # FT95 typical format (example: [0, 118, 1, 255, 254])
-            temp_raw = int.from_bytes(data[1:3], byteorder='little') / 10.0
-            reading = {
-                'temperature_c': temp_raw,
-                'temperature_f': (temp_raw * 9/5) + 32,
-                'timestamp': datetime.now().isoformat(),
-                'time_display': datetime.now().strftime("%H:%M:%S"),
-                'date_display': datetime.now().strftime("%Y-%m-%d"),
-                'status': 'Connected',
-                'device': self.device_name
-            }
+            # 0x2A1C = IEEE-11073 Temperature Measurement, 0xFFF4 = FT95 vendor frame
+            try:
+                temperature_c, device_epoch_ms, temperature_type = decode_notification(
+                    data, vendor=uuid == Config.FT95_TEMP_CHAR_UUID)
+            except FrameError as e:
+                self.rejected_frames += 1
+                print(f"   ⚠️ {self.device_name}: rejected frame {bytes(data).hex()} ({e})")
+                return
+            reading = Reading(
+                temperature_c=temperature_c,
+                device=self.device_name,
+                mac_address=self.mac_address,
+                device_epoch_ms=device_epoch_ms,
+                temperature_type=temperature_type
+            )
+            reading.stamp('notify', received)
             if self.callback:
                 self.callback(reading)
         except Exception as e:
             print(f"   ❌ Data Parsing Error: {e}")
 
+    def _set_connected(self, connected):
+        """Update connection state and tell the system only when it actually changes"""
+        if self.connected == connected:
+            return
+        self.connected = connected
+        if self.state_callback:
+            self.state_callback(self)
+
+    def _update_info(self, name, value):
+        if getattr(self, name) != value:
+            setattr(self, name, value)
+            if self.state_callback:
+                self.state_callback(self)
+
+    def _on_battery(self, characteristic, data):
+        if data:
+            self._update_info('battery', min(100, data[0]))
+
+    def _on_unit(self, characteristic, data):
+        if data:
+            self._update_info('unit', '°F' if data[0] else '°C')
+
+    async def read_device_info(self, client):
+        """Battery and unit: GATT read only when the cached values expired, then change notifications"""
+        fresh = self._info_read_at is not None and time.monotonic() - self._info_read_at < Config.DEVICE_INFO_TTL
+        for uuid, handler in ((Config.FT95_BATTERY_CHAR_UUID, self._on_battery),
+                              (Config.FT95_UNIT_CHAR_UUID, self._on_unit)):
+            characteristic = client.services.get_characteristic(uuid)
+            if characteristic is None:
+                continue
+            if not fresh and 'read' in characteristic.properties:
+                handler(characteristic, await client.read_gatt_char(characteristic))
+            if 'notify' in characteristic.properties or 'indicate' in characteristic.properties:
+                await client.start_notify(characteristic, handler)
+        if not fresh:
+            self._info_read_at = time.monotonic()
+
+    def _on_disconnect(self, client):
+        """bleak disconnect callback - wakes the session instead of polling"""
+        self._set_connected(False)
+        print(f"   🔌 {self.device_name} disconnected")
+        if self._disconnected:
+            self._disconnected.set()
+
+    async def find_device(self):
+        """Wait for the thermometer to advertise (shared scanner if available)"""
+        if self.scanner:
+            # Shared scanner advertisement aate hi jagaye ga, koi polling nahi
+            return await self.scanner.wait_for_device(self.mac_address)
+        return await BleakScanner.find_device_by_address(self.mac_address, timeout=5.0)
+
+    def _get_client(self, device):
+        """Reuse the cached BleakClient so reconnects skip setup and full GATT discovery"""
+        if self.client is None:
+            self.client = BleakClient(
+                device,
+                disconnected_callback=self._on_disconnect,
+                # Sirf zaroori services discover karein
+                services=self._discovery_services(),
+                timeout=Config.CONNECTION_TIMEOUT,
+                winrt={'use_cached_services': True}
+            )
+        return self.client
+
+    @staticmethod
+    def _discovery_services():
+        """Services to discover: thermometer + vendor, plus the one carrying RACP (None = all)"""
+        services = [HEALTH_THERMOMETER_SERVICE_UUID, Config.FT95_SERVICE_UUID]
+        if Config.MEMORY_DOWNLOAD:
+            if not Config.FT95_MEMORY_SERVICE_UUID:
+                return None  # RACP ki service maloom nahi: poori discovery (cache ki wajah se sirf pehli dafa)
+            services.append(Config.FT95_MEMORY_SERVICE_UUID)
+        return services
+
+    async def _start_notifications(self, client):
+        """Subscribe to the temperature characteristic, remembering which UUID worked"""
+        candidates = [TEMP_CHAR_UUID, Config.FT95_TEMP_CHAR_UUID]
+        if self._notify_uuid:
+            candidates.remove(self._notify_uuid)
+            candidates.insert(0, self._notify_uuid)
+        
+        last_error = None
+        for uuid in candidates:
+            try:
+                await client.start_notify(uuid, self.notification_handler)
+                self._notify_uuid = uuid
+                return uuid
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    async def download_stored(self, client):
+        """Pull every stored measurement in one RACP transfer and hand them over as one batch"""
+        racp = client.services.get_characteristic(RACP_UUID)
+        if racp is None:
+            return 0  # is device mein memory access nahi
+        
+        frames = []
+        done = asyncio.Event()
+        response = {}
+        
+        def on_racp(characteristic, data):
+            if len(data) >= 4 and data[0] == RACP_RESPONSE:
+                response['code'] = data[3]
+                done.set()
+        
+        # Vendor (FFF4) mode mein RACP records 0x2A1C par aate hain: download ke dauran wo bhi subscribe
+        records_uuid = None
+        if self._notify_uuid != TEMP_CHAR_UUID and client.services.get_characteristic(TEMP_CHAR_UUID):
+            records_uuid = TEMP_CHAR_UUID
+        
+        self._capture = frames
+        try:
+            if records_uuid:
+                await client.start_notify(records_uuid, self.notification_handler)
+            await client.start_notify(racp, on_racp)
+            await client.write_gatt_char(racp, RACP_REPORT_ALL, response=True)
+            await asyncio.wait_for(done.wait(), timeout=Config.MEMORY_DOWNLOAD_TIMEOUT)
+        except asyncio.TimeoutError:
+            # Adhuri transfer: jo records aa chuke hain wo phir bhi ingest karein
+            print(f"   ⚠️ {self.device_name}: memory download timed out after {len(frames)} record(s)")
+        finally:
+            self._capture = None
+            if client.is_connected:
+                await client.stop_notify(racp)
+                if records_uuid:
+                    await client.stop_notify(records_uuid)
+        
+        if done.is_set() and response.get('code') not in (RACP_SUCCESS, RACP_NO_RECORDS):
+            print(f"   ⚠️ {self.device_name}: memory download failed (RACP code {response.get('code')})")
+        
+        # Poori memory ek vectorized pass mein; bina waqt ke record skip (dedup nahi ho sakta)
+        decoded = decode_frames(frames)
+        self.rejected_frames += int((~decoded.valid).sum())
+        readings = readings_from_frames(decoded, self.device_name, self.mac_address)
+        
+        self.stored_downloaded += len(readings)
+        if readings and self.batch_callback:
+            self.batch_callback(readings)
+        return len(readings)
+
     async def continuous_real_read(self, callback, interval=2):
         self.callback = callback
         while True:
             try:
                 # 1. Scanner: Har waqt check karega ke thermometer on hua ya nahi
-                device = await BleakScanner.find_device_by_address(self.mac_address, timeout=5.0)
+                device = await self.find_device()
                 
                 if device:
                     print(f"   🔗 FT95 Found! Connecting...")
-                    async with BleakClient(device) as client:
-                        self.connected = True
-                        print(f"   ✅ Connected! Waiting for button press...")
-                        
+                    started = time.perf_counter()
+                    self._disconnected = asyncio.Event()
+                    client = self._get_client(device)
+                    await client.connect()
+                    try:
                         # Notifications start karein
-                        await client.start_notify(TEMP_CHAR_UUID, self.notification_handler)
+                        uuid = await self._start_notifications(client)
+                        self._set_connected(True)
+                        self.last_connect_ms = round((time.perf_counter() - started) * 1000, 1)
+                        print(f"   ✅ Connected in {self.last_connect_ms} ms! Notifications on {uuid[4:8]}, waiting for button press...")
+                        
+                        try:
+                            await self.read_device_info(client)
+                        except Exception as e:
+                            print(f"   ⚠️ {self.device_name}: battery/unit read error: {e}")
+                        
+                        # Scanning ke dauran li gayi readings device ki memory se
+                        if Config.MEMORY_DOWNLOAD:
+                            try:
+                                count = await self.download_stored(client)
+                                if count:
+                                    print(f"   📥 {self.device_name}: {count} stored measurement(s) downloaded")
+                            except Exception as e:
+                                print(f"   ⚠️ {self.device_name}: memory download error: {e}")
                         
-                        # Jab tak device signal de rahi hai, yahin rukay raho
-                        while client.is_connected:
-                            await asyncio.sleep(1)
+                        # Disconnect callback aane tak so jao (koi periodic wakeup nahi),
+                        # phir loop foran dobara connect karega
+                        await self._disconnected.wait()
+                    finally:
+                        self._set_connected(False)
+                        if client.is_connected:
+                            await client.disconnect()
                             
                 else:
                     # Agar device nahi mili (off hai), to 2 sec wait karke dobara scan karein
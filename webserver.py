@@ -2,12 +2,44 @@
 Flask Web Server - Fixed for Socket.IO connection
 """
 
-from flask import Flask, render_template, jsonify, request, current_app
-from flask_socketio import SocketIO, emit
+from flask import Flask, Response, render_template, jsonify, request, current_app
+from flask_socketio import SocketIO, emit, join_room, leave_room, rooms
 from config import Config
+from broadcaster import ALL_READINGS_ROOM, device_room, ward_room
 from datetime import datetime
-
-socketio = SocketIO(cors_allowed_origins="*", async_mode='threading')
+import zlib
+import json_codec
+from metrics import metrics
+
+MAX_CLIENT_SAMPLES = 200  # per client_metrics message
+
+# Socket.IO packets bhi json_codec se: pehle se encoded readings dobara serialize nahi hoti
+socketio = SocketIO(cors_allowed_origins="*", async_mode=Config.ASYNC_MODE, json=json_codec)
+
+RESOLUTION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+def _parse_time_ms(value):
+    """Epoch seconds, epoch milliseconds or ISO-8601 -> epoch ms"""
+    try:
+        number = float(value)
+        return int(number if number > 1e11 else number * 1000)
+    except ValueError:
+        return int(datetime.fromisoformat(value).timestamp() * 1000)
+
+def _parse_resolution_ms(value):
+    """'300', '30s', '5m', '1h', '1d' -> bucket width in ms"""
+    value = value.strip().lower()
+    unit = RESOLUTION_UNITS.get(value[-1:])
+    seconds = float(value[:-1]) * unit if unit else float(value)
+    if seconds <= 0:
+        raise ValueError("resolution must be positive")
+    return int(seconds * 1000)
+
+def _json_response(body, etag=None):
+    response = Response(body, mimetype='application/json')
+    if etag:
+        response.set_etag(etag)
+    return response
 
 def create_app(system_instance):
     """Create Flask application"""
@@ -30,44 +62,159 @@ def create_app(system_instance):
     
     @app.route('/api/status')
     def get_status_api():
-        """API endpoint for system status"""
-        return jsonify(system_instance.get_status())
+        """API endpoint for system status (pre-serialized snapshot, no locks)"""
+        return _json_response(system_instance.get_status_json())
+    
+    @app.route('/metrics')
+    def get_metrics():
+        """Latency histograms per pipeline stage (?format=prometheus for scrapers)"""
+        if request.args.get('format') == 'prometheus':
+            return Response(metrics.prometheus(), mimetype='text/plain; version=0.0.4')
+        return jsonify(metrics.snapshot())
     
     @app.route('/api/readings')
     def get_readings():
-        """API endpoint for recent readings"""
-        count = request.args.get('count', default=10, type=int)
-        return jsonify(system_instance.get_recent_readings(count))
-
+        """Recent readings, or min/max/mean buckets for ?from=&to=&device=&resolution="""
+        args = request.args
+        range_mode = any(key in args for key in ('from', 'to', 'device', 'resolution'))
+        
+        # ETag = data version + query; bina 'to' ke range "abhi tak" hai aur har waqt badalti hai
+        etag = None
+        if not range_mode or 'to' in args:
+            version = system_instance.store.committed_seq if range_mode else system_instance.broadcaster.last_seq
+            etag = f"{version:x}-{zlib.crc32(request.query_string):08x}"
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+        
+        if not range_mode:
+            count = request.args.get('count', default=10, type=int)
+            readings = system_instance.get_recent_readings(count)
+            return _json_response(json_codec.encode_list(reading.to_json() for reading in readings), etag)
+        
+        try:
+            end_ms = _parse_time_ms(args['to']) if 'to' in args else int(datetime.now().timestamp() * 1000)
+            start_ms = _parse_time_ms(args['from']) if 'from' in args else end_ms - 86400 * 1000
+            if start_ms >= end_ms:
+                raise ValueError("'from' must be before 'to'")
+            requested_ms = _parse_resolution_ms(args['resolution']) if 'resolution' in args else 0
+            # Range ke hisaab se itna bucket ke sirf MAX_QUERY_POINTS points wapas jayein (min 1s)
+            bucket_ms = max(requested_ms, -(-(end_ms - start_ms) // Config.MAX_QUERY_POINTS), 1000)
+            start_iso = datetime.fromtimestamp(start_ms / 1000).isoformat()
+            end_iso = datetime.fromtimestamp(end_ms / 1000).isoformat()
+        except (ValueError, OverflowError, OSError) as e:
+            return jsonify({'error': f"Invalid query: {e}"}), 400
+        
+        buckets = system_instance.dispatcher.call_blocking(
+            system_instance.store.query_buckets, start_ms, end_ms, bucket_ms, args.get('device'))
+        for bucket in buckets:
+            bucket['start'] = datetime.fromtimestamp(bucket['epoch_ms'] / 1000).isoformat()
+        return _json_response(json_codec.encode({
+            'from': start_iso,
+            'to': end_iso,
+            'device': args.get('device'),
+            'resolution_s': bucket_ms / 1000,
+            'buckets': buckets
+        }), etag)
+
+    def parse_subscription(data):
+        """Rooms + reading filter for {'devices': [...], 'wards': [...]} (empty = all readings)"""
+        devices = [mac.upper() for mac in data.get('devices') or []]
+        wards = list(data.get('wards') or [])
+        targets = [device_room(mac) for mac in devices] + [ward_room(ward) for ward in wards]
+        
+        def wanted(reading):
+            return (not targets or reading.mac_address in devices
+                    or system_instance.broadcaster.wards.get(reading.mac_address) in wards)
+        return devices, wards, targets or [ALL_READINGS_ROOM], wanted
+    
+    def join_rooms(targets):
+        """Leave the previous subscription rooms and join `targets`"""
+        for room in rooms():
+            if room != request.sid:
+                leave_room(room)
+        for room in targets:
+            join_room(room)
+    
+    def send_snapshot(wanted):
+        """Current reading + last 10 readings the client is interested in"""
+        recent = [reading for reading in system_instance.get_recent_readings(Config.MAX_READINGS_DISPLAY) if wanted(reading)][:10]
+        if recent:
+            emit('new_reading', recent[0].to_json())
+        # Khali list bhi bhejein: client apna purana seq state reset kar le
+        emit('recent_readings', [reading.to_json() for reading in recent])
+    
+    def send_missed(readings, wanted):
+        """Readings the client has not seen yet (oldest first), filtered by its subscription"""
+        missed = [reading for reading in readings if wanted(reading)]
+        if missed:
+            emit('missed_readings', [reading.to_json() for reading in missed])
+    
     @socketio.on('connect')
     def handle_connect(auth=None):
-        """FIXED: Handles connection and sends initial status"""
+        """Send status, then either the readings missed since auth.last_seq or a snapshot"""
         print(f"🌐 New client connected")
+        auth = auth if isinstance(auth, dict) else {}
+        
+        # Subscription bhi auth mein aa sakti hai (default: saari readings)
+        devices, wards, targets, wanted = parse_subscription(auth)
         
         # Send current status using the fixed get_status method
-        emit('system_status', system_instance.get_status())
+        emit('system_status', system_instance.get_status_json())
         
-        # Send current reading if available
-        if system_instance.current_reading:
-            emit('new_reading', system_instance.current_reading)
+        # History pehle, rooms baad mein: warna live new_reading missed se pehle pohanch jati hai
+        covered = system_instance.broadcaster.last_seq
+        last_seq = auth.get('last_seq')
+        missed = None
+        if isinstance(last_seq, int) and last_seq > 0:
+            missed = system_instance.get_readings_since(last_seq)
+            if missed is not None:
+                send_missed(missed, wanted)
+        if missed is None:
+            # Naya client, bohat peeche reh gaya ya server se aage (data reset): full snapshot
+            send_snapshot(wanted)
         
-        # Send recent readings
-        recent = system_instance.get_recent_readings(10)
-        if recent:
-            emit('recent_readings', recent)
+        join_rooms(targets)
+        # Is dauran publish hui readings (client seq set se duplicate hata deta hai)
+        gap = system_instance.get_readings_since(covered)
+        if gap:
+            send_missed(gap, wanted)
     
     @socketio.on('disconnect')
     def handle_disconnect():
         print(f"🌐 Client disconnected")
     
+    @socketio.on('subscribe')
+    def handle_subscribe(data=None):
+        """Receive new_reading only for {'devices': [MAC...], 'wards': [...]} (empty = all)"""
+        devices, wards, targets, wanted = parse_subscription(data or {})
+        join_rooms(targets)
+        emit('subscribed', {'devices': devices, 'wards': wards})
+        
+        # Sirf subscribed devices ki recent history
+        send_snapshot(wanted)
+    
+    @socketio.on('client_metrics')
+    def handle_client_metrics(data):
+        """Dashboard timings: receive->paint (browser clock) and notify->paint (wall clocks)"""
+        if not isinstance(data, dict):
+            return
+        for key, name in (('paint_ms', 'client_receive_to_paint'), ('age_ms', 'notify_to_paint')):
+            samples = data.get(key)
+            if isinstance(samples, list):
+                for value in samples[:MAX_CLIENT_SAMPLES]:
+                    if isinstance(value, (int, float)) and 0 <= value < 3600 * 1000:
+                        metrics.observe(name, value)
+    
     @socketio.on('request_status')
     def handle_status_request():
-        emit('status_update', system_instance.get_status())
+        emit('status_update', system_instance.get_status_json())
     
     @socketio.on('request_readings')
     def handle_readings_request(data):
         count = data.get('count', 10)
-        emit('readings_update', system_instance.get_recent_readings(count))
+        emit('readings_update', [reading.to_json() for reading in system_instance.get_recent_readings(count)])
     
     return app
 